@@ -5,14 +5,22 @@
 # - SerpApi via HTTP (no import errors)
 # - PERFECT SHOPPING CART (qty + remove + total)
 # - Login + AI + History
+# - Slow request profiler (CHATBOT_PROFILE=1)
+# - Local catalog first, SerpApi only on a miss (cached in live_cache.db)
+# - Instant template replies for structured queries, LLM for the rest
 # -----------------------------------------------------------
 
 import os
+import functools
 import streamlit as st
-import requests
 from urllib.parse import quote_plus
 from dotenv import load_dotenv
-from openai import OpenAI
+
+from catalog import CatalogStore
+from hybrid_search import HybridSearch
+from reply_router import ReplyRouter, TEMPLATE
+from live_search import serpapi_shopping, openai_reply
+from profiler import profile_request
 
 # -----------------------------------------------------------
 # LOAD ENV
@@ -30,12 +38,9 @@ if not SERPAPI_API_KEY:
     st.error("❌ Missing SERPAPI_API_KEY in .env")
     st.stop()
 
-# Set environment variable (backup)
+# Set environment variable (backup, live_search's OpenAI client reads it)
 os.environ["OPENAI_API_KEY"] = OPENAI_API_KEY
 
-# Initialize OpenAI Client
-client = OpenAI(api_key=OPENAI_API_KEY)
-
 
 # -----------------------------------------------------------
 # UTILS
@@ -46,99 +51,29 @@ def product_image_url(name):
     return f"https://via.placeholder.com/500x300.png?text={txt}"
 
 
-def convert_price_to_int(price):
-    """Convert ₹12,999 → 12999"""
-    if not price:
-        return 0
-    digits = ''.join([c for c in price if c.isdigit()])
-    return int(digits) if digits else 0
-
-
 # -----------------------------------------------------------
-# SHOPPING SEARCH - SERPAPI (HTTP)
+# HYBRID SEARCH (CATALOG FIRST, SERPAPI ON MISS)
 # -----------------------------------------------------------
-def serpapi_shopping(query, num=8):
-    url = "https://serpapi.com/search.json"
-
-    params = {
-        "engine": "google_shopping",
-        "q": query,
-        "api_key": SERPAPI_API_KEY,
-        "hl": "en",
-        "gl": "in",
-        "num": num,
-    }
-
-    try:
-        res = requests.get(url, params=params).json()
-    except:
-        return []
-
-    items = res.get("shopping_results", [])
-    results = []
-
-    for item in items[:num]:
-        results.append({
-            "title": item.get("title"),
-            "price": convert_price_to_int(item.get("price", "")),
-            "price_str": item.get("price", ""),
-            "source": item.get("source"),
-            "link": item.get("link"),
-            "thumb": item.get("thumbnail"),
-            "snippet": item.get("snippet") or item.get("description")
-        })
-
-    return results
+@st.cache_resource
+def get_hybrid_search():
+    # one per process: catalog snapshot + live cache + route counters
+    return HybridSearch(CatalogStore("mega_real_product_dataset.csv"),
+                        live_fetch=functools.partial(serpapi_shopping, raise_errors=True))
+
+ROUTE_LABELS = {
+    "local": "📦 from our catalog",
+    "cache": "🗄 from cached live results",
+    "live": "🌐 live from the internet",
+    "mixed": "📦 catalog + 🌐 live",
+}
 
 
 # -----------------------------------------------------------
-# OPENAI SMART REPLY
+# REPLY ROUTER (TEMPLATE FAST-PATH / LLM)
 # -----------------------------------------------------------
-def openai_reply(username, query, results, history):
-
-    evidence = []
-    for i, r in enumerate(results):
-        evidence.append(
-            f"{i+1}. {r['title']} | ₹{r['price']} | {r['source']}"
-        )
-
-    evidence_text = "\n".join(evidence) if evidence else "No results found."
-    recent = "\n".join([h["user"] for h in history[-3:]]) if history else "None"
-
-    system_prompt = (
-        "You are a friendly Indian shopping assistant. "
-        "Use Hinglish (Hindi + English). "
-        "Call the user '<username> bhai'. "
-        "Recommend best 3 products + 2 alternatives. "
-        "Use live product evidence. "
-        "End with: 'Bhai bolo next kya compare karna hai?'"
-    )
-
-    user_prompt = f"""
-User Name: {username}
-Query: {query}
-
-Live Products:
-{evidence_text}
-
-Recent Searches:
-{recent}
-"""
-
-    try:
-        ai = client.chat.completions.create(
-            model="gpt-4o-mini",
-            temperature=0.3,
-            max_tokens=350,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ]
-        )
-        return ai.choices[0].message.content
-
-    except Exception as e:
-        return f"⚠️ AI Error: {e}"
+@st.cache_resource
+def get_reply_router():
+    return ReplyRouter(llm_reply=openai_reply)
 
 
 # -----------------------------------------------------------
@@ -228,7 +163,8 @@ with st.sidebar:
             st.markdown(f"### {item['title']}")
             st.write(f"Price: ₹{item['price']:,}")
             st.write(f"Qty: {item['qty']}")
-            st.write(f"[Open Product]({item['link']})")
+            if item["link"]:
+                st.write(f"[Open Product]({item['link']})")
 
             c1, c2, c3 = st.columns(3)
 
@@ -258,6 +194,19 @@ with st.sidebar:
             st.rerun()
 
     st.markdown("---")
+    hybrid = get_hybrid_search()
+    served = sum(hybrid.counts.values())
+    if served:
+        external = hybrid.live_calls
+        st.caption(f"Searches: {served} · SerpApi calls: {external} "
+                   f"({100 * max(0, served - external) // served}% answered without one)")
+        if hybrid.live_errors:
+            st.caption(f"SerpApi errors: {hybrid.live_errors}")
+        for route, s in get_reply_router().stats().items():
+            if s["count"]:
+                st.caption(f"{route}: {s['count']} replies · p50 {s['p50_ms']:.0f} ms · "
+                           f"p95 {s['p95_ms']:.0f} ms")
+
     st.write(f"Logged in as: **{st.session_state.user}**")
 
     if st.button("Logout"):
@@ -275,17 +224,22 @@ query = st.text_input("Search any product (e.g., best phone under 30000)")
 
 
 if st.button("Search") and query.strip() != "":
-    st.info("Searching live internet results...")
-
-    with st.spinner("Fetching products..."):
-        products = serpapi_shopping(query)
+    with profile_request("search", query):
+        with st.spinner("Fetching products..."):
+            products, search_meta = get_hybrid_search().search(query)
 
-    st.success(f"Found {len(products)} items!")
+        st.success(f"Found {len(products)} items! ({ROUTE_LABELS[search_meta['route']]})")
+        if search_meta.get("live_error"):
+            st.warning("⚠️ Live search abhi fail hua – jo mila wahi dikha rahe hain.")
 
-    with st.spinner("AI analyzing..."):
-        reply = openai_reply(st.session_state.user, query, products, st.session_state.history)
+        with st.spinner("AI analyzing..."):
+            reply, reply_route = get_reply_router().reply(
+                st.session_state.user, query, products, search_meta, st.session_state.history
+            )
 
     st.markdown("### 🤖 AI Assistant Reply")
+    if reply_route == TEMPLATE:
+        st.caption("⚡ Instant reply (no AI call needed)")
     st.write(reply)
 
     st.session_state.history.append({"user": query})
@@ -304,6 +258,8 @@ if st.button("Search") and query.strip() != "":
             st.markdown(f"**{p['title']}**")
             st.write(f"Price: ₹{p['price']:,}")
             st.write(f"Store: {p['source']}")
+            if p.get("rating"):
+                st.write(f"Rating: ⭐ {p['rating']}")
 
             if st.button("Add to Cart", key=f"add{i}"):
                 add_to_cart(p)
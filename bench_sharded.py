@@ -0,0 +1,142 @@
+# bench_sharded.py
+# ---------------------------------------------
+# ⏱ BENCHMARK: single-process Catalog vs ShardedCatalog
+# - Blows up mega_real_product_dataset.csv to N rows (synthetic SKUs)
+# - Runs the same query mix on 1 process and on 1, 2, 4, ... shards
+# - Checks the sharded top-k is identical to the single-process top-k,
+#   also after a catalog update forwarded to the workers (Catalog.apply)
+# - Prints ms/query and speedup per shard count, plus the time to forward
+#   the update vs. a full shard rebuild
+# - Speedup needs one free core per shard; on fewer cores the shards just
+#   take turns (the script prints the core count)
+#
+# Usage: python bench_sharded.py --rows 2000000 --shards 1 2 4 8
+# ---------------------------------------------
+
+import os
+import time
+import random
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from catalog import Catalog, prepare_frame, CSV_PATH
+from sharded_search import ShardedCatalog
+
+QUERIES = [
+    # (brand, category, price_min, price_max)
+    ("samsung", None, None, None),
+    ("samsung", "Smartphone", None, 30000),
+    (None, "Laptop", 40000, 60000),
+    ("nike", "Fashion", None, None),
+    (None, None, None, 500),
+    (None, None, 50000, None),
+    ("galaxy s2", None, None, None),     # multi-word -> full name scan
+]
+SIMILAR = ["iphone 15", "dell inspiron", "samsung galaxy"]
+
+
+def synthetic_catalog(rows, seed=7):
+    """Repeat the real catalog with new ids and jittered price / rating."""
+    base = pd.read_csv(CSV_PATH)
+    rng = np.random.default_rng(seed)
+    reps = -(-rows // len(base))
+    df = pd.concat([base] * reps, ignore_index=True).head(rows)
+    n = len(df)
+    df["product_id"] = [f"S{i:08d}" for i in range(n)]
+    # small suffix set keeps the token vocabulary realistic
+    df["product_name"] = df["product_name"] + " v" + (np.arange(n) % 40).astype(str)
+    df["price"] = (df["price"] * rng.uniform(0.8, 1.2, n)).astype(int)
+    df["rating"] = np.clip(df["rating"] + rng.choice([-0.2, -0.1, 0, 0.1], n), 1, 5).round(1)
+    return prepare_frame(df)
+
+def run_queries(search, similar, k):
+    out = []
+    for brand, category, low, high in QUERIES:
+        out.append(list(search(brand, category, low, high, k)["product_id"]))
+    for q in SIMILAR:
+        base, sim = similar(q, k)
+        out.append(None if base is None else [base["product_id"]] + list(sim["product_id"]))
+    return out
+
+def update_batch(catalog, size, seed=11):
+    """
+    Random price / rating / category changes, new products and deletes.
+    The first "samsung galaxy" match moves to Laptop: with category shards
+    it is appended to another shard, but must stay the find_similar base.
+    """
+    rng = random.Random(seed)
+    ids = list(catalog.df.index)
+    cats = sorted(catalog.df["category"].unique())
+    upserts = [{"product_id": pid, "price": rng.randrange(500, 90_000, 500),
+                "rating": rng.choice([4.2, 4.5, 4.8])} for pid in rng.sample(ids, size)]
+    upserts += [{"product_id": pid, "category": rng.choice(cats)} for pid in rng.sample(ids, size // 10)]
+    upserts += [{"product_id": f"U{i:06d}", "product_name": f"Samsung Galaxy Update {i}",
+                 "category": "Smartphone", "price": 25_000, "rating": 4.5} for i in range(size // 10)]
+    upserts.append({"product_id": catalog.name_matches("samsung galaxy").index[0], "category": "Laptop"})
+    deletes = rng.sample(ids, size // 10)
+    return upserts, deletes
+
+def timed(fn, repeat):
+    fn()   # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    per_query = (time.perf_counter() - start) * 1000 / repeat / (len(QUERIES) + len(SIMILAR))
+    return per_query, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded catalog search benchmark.")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--shards", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--by", choices=["hash", "category"], default="hash")
+    parser.add_argument("-k", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--update-size", type=int, default=1000, help="products changed by the update batch")
+    args = parser.parse_args()
+
+    print(f"Building synthetic catalog: {args.rows:,} rows ...")
+    df = synthetic_catalog(args.rows)
+    single = Catalog.from_frame(df)
+
+    def single_search(brand, category, low, high, k):
+        return single.filter(brand=brand, category=category, price_min=low, price_max=high).head(k)
+
+    def single_similar(q, k):
+        cand = single.name_matches(q)
+        if cand.empty:
+            return None, None
+        base = cand.iloc[0]
+        return base, single.similar_to(base).head(k)
+
+    base_ms, expected = timed(lambda: run_queries(single_search, single_similar, args.k), args.repeat)
+    updated = single.apply(*update_batch(single, args.update_size))
+    _, change_upserts, change_deletes = updated.changelog[-1]
+    single = updated
+    expected_after = run_queries(single_search, single_similar, args.k)
+    print(f"\ncpu cores: {os.cpu_count()}, shard by: {args.by}, top-k: {args.k}")
+    print(f"{'mode':<14}{'ms/query':>10}{'speedup':>10}  identical  {'update ms':>10}{'rebuild ms':>11}  identical")
+    print(f"{'single':<14}{base_ms:>10.1f}{1.0:>10.2f}  -")
+
+    for n in args.shards:
+        start = time.perf_counter()
+        with ShardedCatalog(df, n_shards=n, by=args.by) as sc:
+            rebuild_ms = (time.perf_counter() - start) * 1000
+            queries = lambda: run_queries(
+                lambda b, c, lo, hi, k: sc.filter(brand=b, category=c, price_min=lo, price_max=hi, k=k),
+                sc.find_similar, args.k)
+            ms, got = timed(queries, args.repeat)
+            start = time.perf_counter()
+            sc.apply(change_upserts, change_deletes)
+            update_ms = (time.perf_counter() - start) * 1000
+            got_after = queries()
+        same = "yes" if got == expected else "NO"
+        same_after = "yes" if got_after == expected_after else "NO"
+        print(f"{f'{n} shard(s)':<14}{ms:>10.1f}{base_ms / ms:>10.2f}  {same:<9}  "
+              f"{update_ms:>10.1f}{rebuild_ms:>11.1f}  {same_after}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,499 @@
+# catalog.py
+# ---------------------------------------------
+# 📦 LIVE PRODUCT CATALOG (HOT RELOAD + INDEXES)
+# Features:
+# - Catalog = immutable snapshot of products + derived indexes
+#     * name tokens   -> product_ids
+#     * category      -> partition frame
+#     * deal candidates (rating >= 4.5, sorted by price)
+#     * sorted price index per category (+ whole catalog) -> price range
+#       queries are a binary search + slice instead of a full scan
+# - Every product keeps its catalog position (_pos column, new products at
+#   the end): equal prices / ratings are ordered by it
+# - CatalogStore watches the CSV (mtime) and an append-only delta file
+#   (catalog_delta.jsonl) with product upserts / deletes
+# - Changes are applied incrementally (only touched index entries change,
+#   sorted indexes by binary search on (price, position), no re-sort)
+#   and the new snapshot is swapped in atomically, so a running query
+#   always sees one consistent catalog
+# - Each snapshot keeps a short log of the change batches that led to it,
+#   so copies elsewhere (shard workers) can follow without a rebuild
+#
+# Delta file format (one JSON per line):
+#   {"op": "upsert", "product": {"product_id": "P001", "price": 69999}}
+#   {"op": "delete", "product_id": "P002"}
+# Records the catalog can't apply are skipped and appended (same format)
+# to catalog_delta.jsonl.rejected
+# ---------------------------------------------
+
+import os
+import re
+import json
+import time
+import bisect
+import threading
+
+import numpy as np
+import pandas as pd
+
+CSV_PATH = "mega_real_product_dataset.csv"
+DELTA_PATH = os.getenv("CATALOG_DELTA_PATH", "catalog_delta.jsonl")
+CHECK_INTERVAL = float(os.getenv("CATALOG_CHECK_INTERVAL", "1.0"))  # seconds between file checks
+
+BASE_COLUMNS = ["product_id", "product_name", "category", "price", "rating"]
+TEXT_COLUMNS = ["product_id", "product_name", "category"]
+DEAL_MIN_RATING = 4.5
+MAX_RATING = 5.0
+MAX_PRICE = 10 ** 12   # ₹1 lakh crore – anything above is a typo (and must fit int64)
+REJECTED_SUFFIX = ".rejected"
+
+# plain words can be answered from the token index (no regex chars, no spaces)
+_PLAIN_TOKEN = re.compile(r"[\w&'-]+")
+
+ALL = None   # price index key for the whole catalog
+DERIVED_COLUMNS = ["name_lower", "cat_lower"]
+CHANGELOG_SIZE = 16   # change batches kept per snapshot
+TOKEN_CACHE_SIZE = 1024   # substring lookups cached per snapshot
+POS_COL = "_pos"   # catalog position
+RANK_COLS = ["rating", "price", POS_COL]
+RANK_ASC = [False, True, True]
+PRICE_KEYS = ["price", POS_COL]   # price index order
+
+
+def prepare_frame(df: pd.DataFrame):
+    """Add lowercase helper columns + catalog position and index rows by product_id."""
+    df = df.copy()
+    df["name_lower"] = df["product_name"].str.lower()
+    df["cat_lower"] = df["category"].str.lower()
+    if POS_COL not in df:
+        df[POS_COL] = np.arange(len(df))
+    df.index = df["product_id"].values
+    return df
+
+def read_catalog_csv(path=CSV_PATH):
+    return prepare_frame(pd.read_csv(path))
+
+def _number(value):
+    """float from an int / float / numeric string, None if it isn't a finite number."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        value = value.replace(",", "").strip()
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if np.isfinite(value) else None
+
+def coerce_product(product):
+    """
+    Product dict with BASE_COLUMNS values converted to the catalog dtypes
+    (text -> str, price -> int, rating -> float), or None if a value can't be
+    used. Only the keys present are checked, so partial upserts stay partial.
+    """
+    out = dict(product)
+    for col in TEXT_COLUMNS:
+        if col in out and (not isinstance(out[col], str) or not out[col].strip()):
+            return None
+    if "price" in out:
+        price = _number(out["price"])
+        if price is None or not 0 <= price <= MAX_PRICE:
+            return None
+        out["price"] = int(round(price))
+    if "rating" in out:
+        rating = _number(out["rating"])
+        if rating is None or not 0 <= rating <= MAX_RATING:
+            return None
+        out["rating"] = rating
+    return out
+
+def _price_entry(frame):
+    """Price index entry: (prices array, frame sorted by PRICE_KEYS)."""
+    return frame["price"].to_numpy(), frame
+
+def _price_sorted(frame):
+    """Price index entry for an unsorted frame. Equal prices keep catalog order."""
+    return _price_entry(frame.iloc[np.lexsort((frame[POS_COL].to_numpy(), frame["price"].to_numpy()))])
+
+def _locate(keys, key):
+    """Position of the tuple `key` in the sorted key arrays: one binary search per key column."""
+    lo, hi = 0, len(keys[0])
+    for col, value in zip(keys, key):
+        part = col[lo:hi]
+        lo, hi = lo + int(np.searchsorted(part, value, "left")), lo + int(np.searchsorted(part, value, "right"))
+    return lo
+
+def _sorted_update(frame, by, gone, come):
+    """
+    `frame` sorted by the columns `by` (ending with POS_COL, so keys are
+    unique) without the rows of `gone` and with the rows of `come`. Their
+    keys are found / placed by binary search – one take, no sort.
+    """
+    keys = [frame[c].to_numpy() for c in by]
+    drop = [_locate(keys, key) for key in zip(*(gone[c].to_numpy() for c in by))]
+    keep = np.delete(np.arange(len(frame)), drop)
+    if not len(come):
+        return frame.iloc[keep]
+    come = come.sort_values(by)[frame.columns]
+    if not len(keep):
+        return come
+    keys = [k[keep] for k in keys]
+    at = [_locate(keys, key) for key in zip(*(come[c].to_numpy() for c in by))]
+    order = np.insert(keep, at, np.arange(len(frame), len(frame) + len(come)))
+    return pd.concat([frame, come]).iloc[order]
+
+
+# ---------- SNAPSHOT ----------
+
+class Catalog:
+    """
+    One consistent version of the catalog. Never mutated after creation –
+    apply() returns a new Catalog that shares all untouched index entries.
+    """
+
+    def __init__(self, df, name_tokens, categories, deals, price_index, version=0, changelog=()):
+        self.df = df
+        self.name_tokens = name_tokens   # token -> frozenset(product_id)
+        self.categories = categories     # cat_lower -> DataFrame partition
+        self.deals = deals               # sorted tuple of (price, product_id)
+        self.price_index = price_index   # cat_lower / ALL -> (prices, frame sorted by price)
+        self.version = version
+        self.changelog = changelog       # ((version, upserted rows, deleted ids), ...) oldest first
+        self._token_cache = {}           # query -> product_ids, safe because nothing changes
+
+    @classmethod
+    def from_frame(cls, df):
+        if not df[POS_COL].is_monotonic_increasing:
+            df = df.sort_values(POS_COL, kind="stable")   # partitions follow catalog order
+        tokens = {}
+        for pid, name in zip(df.index, df["name_lower"]):
+            for tok in set(name.split()):
+                tokens.setdefault(tok, set()).add(pid)
+        name_tokens = {tok: frozenset(ids) for tok, ids in tokens.items()}
+        categories = {cat: part for cat, part in df.groupby("cat_lower", sort=False)}
+        good = df[df["rating"] >= DEAL_MIN_RATING]
+        deals = tuple(sorted(zip(good["price"], good.index)))
+        price_index = {cat: _price_sorted(part) for cat, part in categories.items()}
+        price_index[ALL] = _price_sorted(df)
+        return cls(df, name_tokens, categories, deals, price_index)
+
+    # ----- lookups -----
+
+    def _token_ids(self, query):
+        ids = self._token_cache.get(query)
+        if ids is None:
+            # substring match walks the whole vocabulary – once per query and snapshot
+            ids = set()
+            for tok, tok_ids in self.name_tokens.items():
+                if query in tok:
+                    ids.update(tok_ids)
+            if len(self._token_cache) >= TOKEN_CACHE_SIZE:
+                self._token_cache.clear()
+            self._token_cache[query] = ids
+        return ids
+
+    def _keep_names(self, frame, query):
+        if _PLAIN_TOKEN.fullmatch(query):
+            return frame[frame.index.isin(self._token_ids(query))]
+        return frame[frame["name_lower"].str.contains(query)]
+
+    def name_matches(self, query: str):
+        """Rows whose lowercase name contains `query` (catalog order)."""
+        return self._keep_names(self.df, query)
+
+    def category_rows(self, category: str):
+        part = self.categories.get(category.lower())
+        if part is None:
+            return self.df.iloc[0:0]
+        return part
+
+    def deal_candidates(self, n=10):
+        """Cheapest products with rating >= 4.5."""
+        ids = [pid for _, pid in self.deals[:n]]
+        return self.df.loc[ids]
+
+    def price_rows(self, category=None, low=None, high=None):
+        """Rows with low <= price <= high (None = open end), as a slice of the price index."""
+        key = category.lower() if category else ALL
+        if key not in self.price_index:
+            return self.df.iloc[0:0]
+        prices, frame = self.price_index[key]
+        i = 0 if low is None else int(np.searchsorted(prices, low, side="left"))
+        j = len(prices) if high is None else int(np.searchsorted(prices, high, side="right"))
+        return frame.iloc[i:j]
+
+    def filter(self, brand=None, category=None, price_min=None, price_max=None):
+        if price_min is not None or price_max is not None:
+            results = self.price_rows(category, price_min, price_max)
+        elif category:
+            results = self.category_rows(category)
+        else:
+            results = self.df
+        if brand:
+            results = self._keep_names(results, brand)
+        return results.sort_values(RANK_COLS, ascending=RANK_ASC)
+
+    def similar_to(self, base):
+        """Same category, price within ±30%, best rated first."""
+        low = int(base["price"] * 0.7)
+        high = int(base["price"] * 1.3)
+        band = self.price_rows(base["category"], low, high)
+        return band[band["product_id"] != base["product_id"]].sort_values(RANK_COLS, ascending=RANK_ASC)
+
+    # ----- incremental update -----
+
+    def apply(self, upserts=(), deletes=()):
+        """
+        Return a new Catalog with `upserts` (list of product dicts, may be
+        partial for existing products) and `deletes` (product_ids) applied.
+        Upserts with values that don't fit the column types are skipped.
+        Extra (non-derived) columns of the frame can be set through upserts too.
+        New products get the next catalog position unless they bring POS_COL.
+        """
+        old_df = self.df
+        cols = BASE_COLUMNS + [c for c in old_df.columns if c not in BASE_COLUMNS + DERIVED_COLUMNS]
+        upserts = [p for p in map(coerce_product, upserts) if p is not None and "product_id" in p]
+        # current values of the existing products, one lookup for the batch
+        ids = list(dict.fromkeys(p["product_id"] for p in upserts))
+        current = old_df.loc[old_df.index.intersection(ids), cols].to_dict("index")
+        rows = {}
+        for p in upserts:
+            pid = p["product_id"]
+            if pid not in rows:
+                rows[pid] = dict(current.get(pid, {}))
+            rows[pid].update({k: v for k, v in p.items() if k in cols})
+        # new products need every column
+        rows = {pid: r for pid, r in rows.items()
+                if pid in old_df.index or all(c in r for c in BASE_COLUMNS)}
+        deletes = {pid for pid in deletes if pid in old_df.index and pid not in rows}
+        if not rows and not deletes:
+            return self
+        next_pos = int(old_df[POS_COL].max()) + 1 if len(old_df) else 0
+        for pid, r in rows.items():
+            if POS_COL not in r:
+                r[POS_COL] = next_pos
+                next_pos += 1
+
+        up = prepare_frame(pd.DataFrame(list(rows.values()), columns=cols))
+        changed = [pid for pid in up.index if pid in old_df.index]
+        added = [pid for pid in up.index if pid not in old_df.index]
+
+        # main frame: shallow copy, only columns with changed values are
+        # copied (positional write), no full drop + copy without deletes
+        df = old_df.drop(index=list(deletes)) if deletes else old_df.copy(deep=False)
+        if changed:
+            at = df.index.get_indexer(changed)
+            new_rows = up.loc[changed]
+            for col in up.columns:
+                values = new_rows[col].to_numpy()
+                column = df[col].array
+                if (np.asarray(column[at]) != values).any():
+                    column = column.copy()
+                    column[at] = values
+                    df[col] = column
+        if added:
+            df = pd.concat([df, up.loc[added]])
+
+        deals = list(self.deals)
+        token_out = {}  # token -> product_ids losing it
+        token_in = {}   # token -> product_ids gaining it
+        fields = ["product_id", "name_lower", "cat_lower", "price", "rating", POS_COL]
+        gone = old_df.loc[list(deletes) + changed, fields]   # old rows, out of every index
+        come = up.loc[changed + added]                        # new rows, into every index
+
+        for pid, name, cat, price, rating, _ in gone.itertuples(index=False):
+            for tok in set(name.split()):
+                token_out.setdefault(tok, set()).add(pid)
+            if rating >= DEAL_MIN_RATING:
+                i = bisect.bisect_left(deals, (price, pid))
+                if i < len(deals) and deals[i] == (price, pid):
+                    deals.pop(i)
+
+        for pid, name, cat, price, rating, _ in come[fields].itertuples(index=False):
+            for tok in set(name.split()):
+                token_in.setdefault(tok, set()).add(pid)
+            if rating >= DEAL_MIN_RATING:
+                bisect.insort(deals, (price, pid))
+
+        # one set operation per touched token instead of one per product
+        name_tokens = dict(self.name_tokens)
+        for tok in token_out.keys() | token_in.keys():
+            ids = (name_tokens.get(tok, frozenset()) - token_out.get(tok, set())) | token_in.get(tok, set())
+            if ids:
+                name_tokens[tok] = ids
+            else:
+                name_tokens.pop(tok, None)
+
+        # only touched partitions change: old keys out, new keys in, by catalog
+        # position (partitions) and (price, position) (price indexes)
+        categories = dict(self.categories)
+        price_index = dict(self.price_index)
+        empty = df.iloc[0:0]
+        for cat in set(gone["cat_lower"]) | set(come["cat_lower"]):
+            cat_gone = gone[gone["cat_lower"] == cat]
+            cat_come = come[come["cat_lower"] == cat]
+            part = _sorted_update(categories.get(cat, empty), [POS_COL], cat_gone, cat_come)
+            if len(part):
+                categories[cat] = part
+                _, by_price = price_index.get(cat, (None, empty))
+                price_index[cat] = _price_entry(_sorted_update(by_price, PRICE_KEYS, cat_gone, cat_come))
+            else:
+                categories.pop(cat, None)
+                price_index.pop(cat, None)
+        price_index[ALL] = _price_entry(_sorted_update(self.price_index[ALL][1], PRICE_KEYS, gone, come))
+
+        version = self.version + 1
+        change = (version, up[BASE_COLUMNS + [POS_COL]].to_dict("records"), list(deletes))
+        changelog = (self.changelog + (change,))[-CHANGELOG_SIZE:]
+        return Catalog(df, name_tokens, categories, tuple(deals), price_index, version, changelog)
+
+
+# ---------- STORE / WATCHER ----------
+
+def _file_mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+def _batch(records):
+    """(upserts, deletes) from ("upsert", product) / ("delete", product_id) records, later ones win."""
+    upserts, deletes = [], []
+    for op, value in records:
+        if op == "upsert":
+            pid = value.get("product_id")
+            if pid in deletes:
+                deletes.remove(pid)
+            upserts.append(value)
+        else:
+            upserts = [p for p in upserts if p.get("product_id") != value]
+            deletes.append(value)
+    return upserts, deletes
+
+def diff_frames(old, new):
+    """(upserts, deletes) turning catalog frame `old` into `new`."""
+    deletes = [pid for pid in old.index if pid not in new.index]
+    common = new.index.intersection(old.index)
+    a = old.loc[common, BASE_COLUMNS]
+    b = new.loc[common, BASE_COLUMNS]
+    changed = common[(a != b).any(axis=1).values]
+    added = new.index.difference(old.index)
+    upserts = new.loc[changed.append(added), BASE_COLUMNS].to_dict("records")
+    return upserts, deletes
+
+class CatalogStore:
+    """
+    Holds the current Catalog and keeps it in sync with the CSV and
+    delta file. Readers call current() (or refresh()) once per request and
+    use that snapshot for the whole request.
+    """
+
+    def __init__(self, csv_path=CSV_PATH, delta_path=DELTA_PATH, check_interval=CHECK_INTERVAL):
+        self.csv_path = csv_path
+        self.delta_path = delta_path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+
+        self._csv_mtime = _file_mtime(csv_path)
+        self._csv_df = read_catalog_csv(csv_path)
+        self._delta_offset = 0
+        self.rejected = 0   # change records skipped because apply() failed on them
+        self._catalog = Catalog.from_frame(self._csv_df)
+        self._apply_delta_file()
+
+    def current(self):
+        return self._catalog
+
+    def refresh(self, force=False):
+        """Apply pending CSV / delta changes (at most every check_interval)."""
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval:
+            return self._catalog
+        with self._lock:
+            self._last_check = now
+            mtime = _file_mtime(self.csv_path)
+            if mtime is not None and mtime != self._csv_mtime:
+                try:
+                    new_csv = read_catalog_csv(self.csv_path)
+                except (OSError, ValueError, KeyError, AttributeError):
+                    new_csv = None   # file half-written, try again next time
+                if new_csv is not None:
+                    upserts, deletes = diff_frames(self._csv_df, new_csv)
+                    self._apply_records([("upsert", p) for p in upserts] + [("delete", pid) for pid in deletes])
+                    self._csv_df = new_csv
+                    self._csv_mtime = mtime
+            self._apply_delta_file()
+        return self._catalog
+
+    def _apply_records(self, records):
+        """
+        Apply change records as one batch. If apply() fails, every record is
+        tried on its own and the failing ones are rejected, so one bad record
+        can't make each refresh() fail again.
+        """
+        try:
+            self._catalog = self._catalog.apply(*_batch(records))
+            return
+        except Exception:
+            pass
+        good, bad = [], []
+        for rec in records:
+            try:
+                self._catalog.apply(*_batch([rec]))
+                good.append(rec)
+            except Exception:
+                bad.append(rec)
+        try:
+            self._catalog = self._catalog.apply(*_batch(good))
+        except Exception:
+            bad = records   # only fail together – skip the whole batch
+        self._reject(bad)
+
+    def _reject(self, records):
+        """Append records to the .rejected file, in delta file format."""
+        self.rejected += len(records)
+        lines = [
+            {"op": "upsert", "product": value} if op == "upsert" else {"op": "delete", "product_id": value}
+            for op, value in records
+        ]
+        try:
+            with open(self.delta_path + REJECTED_SUFFIX, "a", encoding="utf-8") as f:
+                for line in lines:
+                    f.write(json.dumps(line, default=str) + "\n")
+        except OSError:
+            pass   # counted in self.rejected, the catalog keeps going
+
+    def _apply_delta_file(self):
+        try:
+            size = os.path.getsize(self.delta_path)
+        except OSError:
+            return
+        if size < self._delta_offset:
+            self._delta_offset = 0   # file was truncated / rotated
+        if size == self._delta_offset:
+            return
+
+        with open(self.delta_path, "rb") as f:
+            f.seek(self._delta_offset)
+            chunk = f.read()
+        # only complete lines, a writer may be in the middle of one
+        end = chunk.rfind(b"\n") + 1
+        if end == 0:
+            return
+
+        records = []
+        for line in chunk[:end].decode("utf-8").splitlines():
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(rec, dict):
+                continue
+            if rec.get("op") == "upsert" and isinstance(rec.get("product"), dict):
+                # catalog position is the store's business, not the delta file's
+                records.append(("upsert", {k: v for k, v in rec["product"].items() if k in BASE_COLUMNS}))
+            elif rec.get("op") == "delete" and isinstance(rec.get("product_id"), str):
+                records.append(("delete", rec["product_id"]))
+        self._apply_records(records)
+        self._delta_offset += end
@@ -0,0 +1,239 @@
+# chatbot_core.py
+# ---------------------------------------------
+# 🧠 CHATBOT LOGIC (NO STREAMLIT)
+# - chatbot_logic(): one chat turn -> Hinglish reply + results frame
+# - Works on a Catalog snapshot (+ optional ShardedCatalog), so it can be
+#   used by ProductChatbot.py and by the load-test harness alike
+# ---------------------------------------------
+
+from query_parser import detect_brand, detect_category, detect_price_range, price_text
+from sharded_search import TOP_K
+
+# ---------- HELPER FUNCTIONS ----------
+
+def filter_products(catalog, brand=None, category=None, price_range=None, shards=None):
+    low, high = (price_range.low, price_range.high) if price_range else (None, None)
+    if shards is not None:
+        return shards.filter(brand=brand, category=category, price_min=low, price_max=high, k=TOP_K)
+    return catalog.filter(brand=brand, category=category, price_min=low, price_max=high)
+
+def find_similar(catalog, product_query: str, shards=None):
+    if shards is not None:
+        return shards.find_similar(product_query, k=TOP_K)
+    cand = catalog.name_matches(product_query)
+    if cand.empty:
+        return None, None
+    base = cand.iloc[0]
+    return base, catalog.similar_to(base)
+
+def help_text():
+    return (
+        "📘 *Help – Example queries:*\n"
+        "- `samsung phone under 30000`\n"
+        "- `laptop between 40k and 60k`\n"
+        "- `best laptop`\n"
+        "- `recommend tv`\n"
+        "- `nike shoes`\n"
+        "- `similar to iPhone 15`\n"
+        "- `beauty products under 500`\n"
+        "- `grocery items`"
+    )
+
+def get_deal_of_the_day(catalog):
+    """Pick a 'deal of the day' product: high rating + low price."""
+    candidates = catalog.deal_candidates(10)
+    if candidates.empty:
+        candidates = catalog.df.sort_values(["rating","price"], ascending=[False, True])
+    # random pick from top 10 candidates
+    top_n = candidates.head(10)
+    row = top_n.sample(1).iloc[0]
+    return row
+
+# ---------- MAIN CHATBOT LOGIC WITH PERSONALITY ----------
+
+def chatbot_logic(msg: str, history: list, catalog, user_name="", shards=None):
+    """
+    One chat turn -> (reply_text, results_df or None).
+    `catalog` is the snapshot for this request, `shards` an optional ShardedCatalog.
+    """
+    msg_low = msg.lower().strip()
+    # personalized calling name
+    if user_name:
+        nice_name = f"{user_name} bhai"
+    else:
+        nice_name = "bhai"
+
+    # HELP
+    if msg_low in ["help","menu","commands"]:
+        return help_text(), None
+
+    # GREETING
+    if any(g in msg_low for g in ["hello","hi "," hi","hey","namaste","yo","sup","hii","hlo"]):
+        deal = get_deal_of_the_day(catalog)
+        return (
+            f"Hello {nice_name} 👋\n"
+            "Main aapka smart shopping assistant hoon.\n\n"
+            "Aap mujhe aise bol sakte ho:\n"
+            "- `samsung phone under 25000`\n"
+            "- `best laptop`\n"
+            "- `nike shoes`\n"
+            "- `similar to iPhone 15`\n\n"
+            f"⭐ Aaj ka special deal:\n"
+            f"**{deal['product_name']}** (₹{deal['price']}, ⭐ {deal['rating']}) – "
+            "ye price ke hisaab se kaafi strong option lag raha hai. 🔥"
+        ), None
+
+    # SIMILAR PRODUCTS
+    if "similar to" in msg_low or msg_low.startswith("similar "):
+        cleaned = (
+            msg_low.replace("similar to","")
+                   .replace("similar","")
+                   .replace("products","")
+                   .replace("show","")
+                   .strip()
+        )
+        if not cleaned:
+            return f"Kis product ke similar chahiye {nice_name}? Example: `similar to iPhone 15`", None
+        base, sim = find_similar(catalog, cleaned, shards=shards)
+        if base is None:
+            return f"❌ `{cleaned}` jaise koi product nahi mila {nice_name}. Naam thoda clear likh ke try karo.", None
+        if sim is None or sim.empty:
+            return f"'{base['product_name']}' ke price/range me koi aur similar option nahi mila 😅", None
+        
+        text = (
+            f"🔁 {nice_name}, aapne **similar products** puchha: **{base['product_name']}**\n\n"
+            f"Ye saare options bhi **{base['category']}** hai, "
+            f"aur lagbhag usi price range (±30%) me hai. Inme se aap kuch dekh sakte ho 👇"
+        )
+        return text, sim
+
+    # PARSE FILTERS
+    wants_reco = any(x in msg_low for x in ["best","recommend","suggest","top"])
+
+    brand = detect_brand(msg_low)
+    category = detect_category(msg_low)
+    price_range = detect_price_range(msg_low)
+
+    history.append({"user": msg, "brand": brand, "category": category, "price_range": price_range})
+    if len(history) > 30:
+        history.pop(0)
+
+    # try to infer from previous history if needed later
+    last_cat = None
+    last_brand = None
+    for h in reversed(history):
+        if not last_cat and h.get("category"):
+            last_cat = h["category"]
+        if not last_brand and h.get("brand"):
+            last_brand = h["brand"]
+        if last_cat and last_brand:
+            break
+
+    # BRAND/CATEGORY/PRICE FILTER
+    if brand or category or price_range is not None:
+        results = filter_products(catalog, brand=brand, category=category, price_range=price_range, shards=shards)
+
+        if not results.empty:
+            top = results.iloc[0]
+            bullet_intro = []
+
+            if brand:
+                bullet_intro.append(f"brand **{brand.title()}**")
+            if category:
+                bullet_intro.append(f"category **{category}**")
+            if price_range is not None:
+                bullet_intro.append(price_text(price_range))
+
+            criteria_text = ", ".join(bullet_intro) if bullet_intro else "aapke criteria ke hisaab se"
+
+            deal = get_deal_of_the_day(catalog)
+
+            text = (
+                f"✅ {nice_name}, {criteria_text} jo sabse sahi lag raha hai wo hai:\n\n"
+                f"**{top['product_name']}** (₹{top['price']}, ⭐ {top['rating']})\n"
+                f"- Category: {top['category']}\n"
+                f"- Reason: Rating achhi hai aur price aapke range me fit ho raha hai.\n\n"
+                f"Neeche maine aur options bhi list kiye hain jo aap compare kar sakte ho 👇\n\n"
+                f"💥 Aaj ka special deal (overall): **{deal['product_name']}** "
+                f"(₹{deal['price']}, ⭐ {deal['rating']}) – "
+                "agar extra option soch rahe ho to isko bhi check kar sakte ho."
+            )
+            return text, results
+
+        # fallback -> best overall
+        best = catalog.df.sort_values(["rating","price"], ascending=[False,True]).head(10)
+        deal = get_deal_of_the_day(catalog)
+        text = (
+            f"❌ {nice_name}, aapke exact filter se koi product nahi mila.\n\n"
+            "Par tension nahi 😄, rating ke hisaab se ye top products hai:\n\n"
+            f"💥 Aaj ka special deal: **{deal['product_name']}** "
+            f"(₹{deal['price']}, ⭐ {deal['rating']})\n"
+            "Baaki options niche list kiye hain 👇"
+        )
+        return text, best
+
+    # ONLY "BEST" / "RECOMMEND"
+    if wants_reco:
+        # 1st priority: current message se category detect
+        cat_guess = detect_category(msg_low)
+
+        # 2nd: previous history se guess
+        if not cat_guess and last_cat:
+            cat_guess = last_cat
+
+        if cat_guess:
+            best_cat = filter_products(catalog, category=cat_guess, shards=shards)
+            top = best_cat.iloc[0]
+            deal = get_deal_of_the_day(catalog)
+            text = (
+                f"⭐ {nice_name}, aapke recent interest ko dekh kar "
+                f"**{cat_guess}** me yeh best option lag raha hai:\n\n"
+                f"**{top['product_name']}** (₹{top['price']}, ⭐ {top['rating']})\n"
+                f"- Category: {top['category']}\n\n"
+                "Aur same category ke kuch aur ache options niche diye hain 👇\n\n"
+                f"💥 Aaj ka special deal (global): **{deal['product_name']}** "
+                f"(₹{deal['price']}, ⭐ {deal['rating']})"
+            )
+            return text, best_cat
+
+        # fallback: overall best using previous brand also
+        best = catalog.df.sort_values(["rating","price"], ascending=[False,True]).head(10)
+        top = best.iloc[0]
+        deal = get_deal_of_the_day(catalog)
+        brand_hint = f" (aap pehle zyada **{last_brand}** dekh rahe the)" if last_brand else ""
+        text = (
+            f"⭐ {nice_name}, overall jo product sabse strong lag raha hai{brand_hint}:\n\n"
+            f"**{top['product_name']}** (₹{top['price']}, ⭐ {top['rating']})\n\n"
+            "Baaki aur top rated options niche diye hain 👇\n\n"
+            f"💥 Aaj ka special deal: **{deal['product_name']}** "
+            f"(₹{deal['price']}, ⭐ {deal['rating']})"
+        )
+        return text, best
+
+    # DIRECT NAME SEARCH
+    direct = catalog.name_matches(msg_low)
+    if not direct.empty:
+        top = direct.iloc[0]
+        deal = get_deal_of_the_day(catalog)
+        text = (
+            f"🔍 {nice_name}, aapne naam se search kiya hai.\n"
+            f"Mujhe yeh product mila:\n\n"
+            f"**{top['product_name']}** (₹{top['price']}, ⭐ {top['rating']})\n\n"
+            "Same naam/range ke kuch aur items bhi niche diye hai 👇\n\n"
+            f"💥 Aaj ka ek aur deal jo aapko pasand aa sakta hai: **{deal['product_name']}** "
+            f"(₹{deal['price']}, ⭐ {deal['rating']})"
+        )
+        return text, direct
+
+    # FALLBACK
+    return (
+        f"❓ {nice_name}, exact samajh nahi aaya aap kya chahte ho 😅\n\n"
+        "Aise try karo:\n"
+        "- `samsung phone under 25000`\n"
+        "- `best laptop`\n"
+        "- `nike shoes`\n"
+        "- `tv under 50000`\n"
+        "- `similar to iPhone 15`\n"
+        "- `help`\n\n"
+        "Phir main aapke liye smart recommendation ke saath full list dunga 🙂"
+    ), None
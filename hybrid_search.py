@@ -0,0 +1,237 @@
+# hybrid_search.py
+# ---------------------------------------------
+# 🔀 HYBRID SEARCH – LOCAL CATALOG FIRST, SERPAPI ONLY ON A MISS
+# Features:
+# - One result schema for catalog + live items (same keys as serpapi_shopping)
+# - Local catalog answers when it understood the query and has enough hits
+# - Otherwise cached live results (sqlite), or a fresh SerpApi call
+# - Live results are written back to the cache table; cached entries older
+#   than LIVE_CACHE_TTL_HOURS are refetched (stale prices)
+# - Per-route counters (local / cache / live / mixed) for the UI
+# - A failing live_fetch (exception) falls back to stale cache / nothing
+#   and is reported in meta["live_error"] + the live_errors counter
+# ---------------------------------------------
+
+import os
+import re
+import time
+import sqlite3
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from query_parser import (
+    CATEGORY_SYNONYMS, WORD_PATTERN, detect_brand, detect_category, model_tokens, split_price,
+)
+
+CACHE_PATH = os.getenv("LIVE_CACHE_PATH", "live_cache.db")
+CACHE_TTL = float(os.getenv("LIVE_CACHE_TTL_HOURS", "24")) * 3600
+MIN_CONFIDENCE = float(os.getenv("LOCAL_MIN_CONFIDENCE", "0.6"))  # understood share x coverage
+MIN_LOCAL_HITS = int(os.getenv("LOCAL_MIN_HITS", "3"))   # catalog hits for full coverage
+MIN_UNDERSTOOD = 0.75   # below this the query asks for something the catalog can't check
+MODEL_WEIGHT = 3   # a model number ("16", "s99") counts as this many words in `understood`
+
+RESULT_KEYS = ["title", "price", "price_str", "source", "link", "thumb", "snippet", "rating", "origin"]
+
+# words that carry no product information
+STOPWORDS = {
+    "best", "top", "recommend", "suggest", "show", "me", "a", "an", "the", "for",
+    "with", "under", "below", "above", "over", "between", "and", "to", "from",
+    "around", "about", "upto", "up", "within", "less", "than", "more", "rs",
+    "inr", "k", "lakh", "price", "buy", "cheap", "good", "new", "latest", "in",
+    "of", "i", "want", "need", "please", "any", "some", "options", "products",
+}
+
+
+def normalize_query(query: str):
+    return " ".join(query.lower().split())
+
+def catalog_item(row):
+    """Catalog row -> common result dict."""
+    return {
+        "title": row["product_name"],
+        "price": int(row["price"]),
+        "price_str": f"₹{int(row['price']):,}",
+        "source": "Our Catalog",
+        "link": None,
+        "thumb": None,
+        "snippet": f"{row['category']} · ⭐ {row['rating']}",
+        "rating": float(row["rating"]),
+        "origin": "catalog",
+    }
+
+
+# ---------- LOCAL ----------
+
+def local_search(catalog, query, num=8):
+    """
+    Answer from the catalog. Returns (items, info) where info has the parsed
+    filters, `understood` (share of meaningful query words the catalog
+    matched) and `confidence` (understood x coverage, where MIN_LOCAL_HITS
+    hits count as full coverage). Model numbers only count as matched when
+    a hit's name has them as a word, so "iphone 16" isn't answered with
+    iPhone 15s.
+    """
+    q = normalize_query(query)
+    brand = detect_brand(q)
+    category = detect_category(q)
+    price_range, rest = split_price(q)
+
+    if brand or category or price_range:
+        low, high = (price_range.low, price_range.high) if price_range else (None, None)
+        results = catalog.filter(brand=brand, category=category, price_min=low, price_max=high)
+    else:
+        results = catalog.name_matches(re.escape(q)).sort_values(["rating", "price"], ascending=[False, True])
+    top = results.head(num)
+
+    # which query words did we actually use / find in the hits?
+    # (the price text is left out: "90000" in "under 90000" is already used)
+    words = [w for w in WORD_PATTERN.findall(rest) if w not in STOPWORDS]
+    models = set(model_tokens(q))
+    known = set(brand.split()) if brand else set()
+    if category:
+        for logical_cat, syns in CATEGORY_SYNONYMS.items():
+            if logical_cat == category.lower():
+                known.update(w for syn in syns for w in syn.split())
+    hit_names = " ".join(top["name_lower"])
+    hit_words = set(WORD_PATTERN.findall(hit_names))
+    weight = {w: MODEL_WEIGHT if w in models else 1 for w in words}
+    explained = [w for w in words
+                 if (w in hit_words if w in models else w in known or w in hit_names)]
+    total = sum(weight.values())
+    understood = sum(weight[w] for w in explained) / total if total else (1.0 if price_range else 0.0)
+
+    coverage = min(1.0, len(top) / MIN_LOCAL_HITS) if MIN_LOCAL_HITS else 1.0
+    info = {
+        "brand": brand,
+        "category": category,
+        "price_range": price_range,
+        "local_hits": len(results),
+        "understood": round(understood, 2),
+        "confidence": round(understood * coverage, 2),
+    }
+    return [catalog_item(r) for _, r in top.iterrows()], info
+
+
+# ---------- LIVE CACHE ----------
+
+class LiveCache:
+    """sqlite table of live results per normalized query."""
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        with self._connect() as con:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS live_results ("
+                " query TEXT, rank INTEGER, title TEXT, price INTEGER, price_str TEXT,"
+                " source TEXT, link TEXT, thumb TEXT, snippet TEXT, rating REAL,"
+                " fetched_at REAL, PRIMARY KEY (query, rank))"
+            )
+
+    @contextmanager
+    def _connect(self):
+        # one short-lived connection per call: safe across Streamlit threads
+        con = sqlite3.connect(self.path, timeout=5)
+        try:
+            with con:   # commit / rollback
+                yield con
+        finally:
+            con.close()
+
+    def get(self, query):
+        """(items, fetched_at) or (None, None)."""
+        with self._connect() as con:
+            rows = con.execute(
+                "SELECT title, price, price_str, source, link, thumb, snippet, rating, fetched_at"
+                " FROM live_results WHERE query = ? ORDER BY rank",
+                (query,),
+            ).fetchall()
+        if not rows:
+            return None, None
+        items = [dict(zip(RESULT_KEYS[:-1], r[:-1]), origin="cache") for r in rows]
+        return items, rows[0][-1]
+
+    def put(self, query, items):
+        now = time.time()
+        with self._connect() as con:
+            con.execute("DELETE FROM live_results WHERE query = ?", (query,))
+            con.executemany(
+                "INSERT INTO live_results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(query, i, it.get("title"), it.get("price"), it.get("price_str"),
+                  it.get("source"), it.get("link"), it.get("thumb"), it.get("snippet"),
+                  it.get("rating"), now)
+                 for i, it in enumerate(items)],
+            )
+
+
+# ---------- PIPELINE ----------
+
+class HybridSearch:
+    """
+        hs = HybridSearch(catalog_store, live_fetch=serpapi_shopping)
+        items, meta = hs.search("samsung phone under 25000")
+    meta["route"] is "local", "cache", "live" or "mixed"; meta["live_error"]
+    is set when the SerpApi call failed.
+    """
+
+    def __init__(self, catalog_store, live_fetch, cache=None,
+                 min_confidence=MIN_CONFIDENCE, ttl=CACHE_TTL):
+        self.catalog_store = catalog_store
+        self.live_fetch = live_fetch
+        self.cache = cache or LiveCache()
+        self.min_confidence = min_confidence
+        self.ttl = ttl
+        self.counts = Counter()   # searches per route
+        self.live_calls = 0       # actual SerpApi requests
+        self.live_errors = 0      # ... of which failed
+        self._lock = threading.Lock()
+
+    def _count(self, route):
+        with self._lock:
+            self.counts[route] += 1
+
+    def _live(self, key, query, num):
+        """
+        Fresh cache hit, else SerpApi (+ write back). Stale cache is the fallback.
+        Returns (items, route, error or None).
+        """
+        cached, fetched_at = self.cache.get(key)
+        if cached and time.time() - fetched_at < self.ttl:
+            return cached[:num], "cache", None
+        error = None
+        try:
+            live = self.live_fetch(query, num=num)
+        except Exception as e:
+            live, error = [], f"{type(e).__name__}: {e}"
+        with self._lock:
+            self.live_calls += 1
+            if error:
+                self.live_errors += 1
+        if live:
+            self.cache.put(key, live)
+            return [dict(it, origin="live") for it in live], "live", None
+        if cached:
+            return cached[:num], "cache", error   # SerpApi down -> old prices beat nothing
+        return [], "live", error
+
+    def search(self, query, num=8):
+        catalog = self.catalog_store.refresh()
+        local, info = local_search(catalog, query, num)
+
+        if local and info["confidence"] >= self.min_confidence:
+            self._count("local")
+            return local, dict(info, route="local")
+
+        live, route, error = self._live(normalize_query(query), query, num)
+        if error:
+            info = dict(info, live_error=error)
+
+        # catalog understood the query but had too few hits -> ours first, live fills up
+        if local and info["understood"] >= MIN_UNDERSTOOD:
+            seen = {it["title"].lower() for it in local}
+            items = local + [it for it in live if (it.get("title") or "").lower() not in seen]
+            self._count("mixed")
+            return items[:num], dict(info, route="mixed")
+
+        self._count(route)
+        return live, dict(info, route=route)
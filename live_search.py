@@ -0,0 +1,147 @@
+# live_search.py
+# -----------------------------------------------------------
+# LIVE SHOPPING SEARCH + AI REPLY (NO STREAMLIT)
+# - serpapi_shopping(): Google Shopping results via SerpApi HTTP
+# - openai_reply(): Hinglish recommendation from gpt-4o-mini
+# - Endpoints from env (SERPAPI_URL, OPENAI_BASE_URL) so the load-test
+#   harness can point them at local stub servers
+# - OPENAI_MAX_RETRIES (SDK default 2); the load test sets 0 so injected
+#   errors are counted instead of hidden as retry latency
+# -----------------------------------------------------------
+
+import os
+import requests
+
+SERPAPI_URL = "https://serpapi.com/search.json"
+SERPAPI_TIMEOUT = float(os.getenv("SERPAPI_TIMEOUT", "15"))
+OPENAI_MODEL = "gpt-4o-mini"
+OPENAI_MAX_RETRIES = 2
+
+_openai_client = None
+
+
+def _client():
+    """Shared OpenAI client (reads OPENAI_API_KEY / OPENAI_BASE_URL from env)."""
+    global _openai_client
+    if _openai_client is None:
+        from openai import OpenAI
+        _openai_client = OpenAI(max_retries=int(os.getenv("OPENAI_MAX_RETRIES", OPENAI_MAX_RETRIES)))
+    return _openai_client
+
+
+class LiveSearchError(Exception):
+    """SerpApi request failed (network error, HTTP error status, bad JSON)."""
+
+
+# -----------------------------------------------------------
+# UTILS
+# -----------------------------------------------------------
+def convert_price_to_int(price):
+    """Convert ₹12,999 → 12999"""
+    if not price:
+        return 0
+    digits = ''.join([c for c in price if c.isdigit()])
+    return int(digits) if digits else 0
+
+
+# -----------------------------------------------------------
+# SHOPPING SEARCH - SERPAPI (HTTP)
+# -----------------------------------------------------------
+def serpapi_shopping(query, num=8, raise_errors=False):
+    """
+    Shopping results as dicts. A failed request gives [] – or raises
+    LiveSearchError with raise_errors=True, so the caller can tell
+    "SerpApi is down" from "no results".
+    """
+    # env read per call: .env is loaded by the app after import,
+    # and the load-test harness points SERPAPI_URL at a local stub
+    url = os.getenv("SERPAPI_URL", SERPAPI_URL)
+
+    params = {
+        "engine": "google_shopping",
+        "q": query,
+        "api_key": os.getenv("SERPAPI_API_KEY"),
+        "hl": "en",
+        "gl": "in",
+        "num": num,
+    }
+
+    try:
+        resp = requests.get(url, params=params, timeout=SERPAPI_TIMEOUT)
+        resp.raise_for_status()
+        res = resp.json()
+    except Exception as e:
+        if raise_errors:
+            raise LiveSearchError(str(e)) from e
+        return []
+
+    items = res.get("shopping_results", [])
+    results = []
+
+    for item in items[:num]:
+        results.append({
+            "title": item.get("title"),
+            "price": convert_price_to_int(item.get("price", "")),
+            "price_str": item.get("price", ""),
+            "source": item.get("source"),
+            "link": item.get("link"),
+            "thumb": item.get("thumbnail"),
+            "snippet": item.get("snippet") or item.get("description"),
+            "rating": item.get("rating"),
+            "origin": "live",
+        })
+
+    return results
+
+
+# -----------------------------------------------------------
+# OPENAI SMART REPLY
+# -----------------------------------------------------------
+def openai_reply(username, query, results, history, stream=False):
+
+    evidence = []
+    for i, r in enumerate(results):
+        evidence.append(
+            f"{i+1}. {r['title']} | ₹{r['price']} | {r['source']}"
+        )
+
+    evidence_text = "\n".join(evidence) if evidence else "No results found."
+    recent = "\n".join([h["user"] for h in history[-3:]]) if history else "None"
+
+    system_prompt = (
+        "You are a friendly Indian shopping assistant. "
+        "Use Hinglish (Hindi + English). "
+        "Call the user '<username> bhai'. "
+        "Recommend best 3 products + 2 alternatives. "
+        "Use live product evidence. "
+        "End with: 'Bhai bolo next kya compare karna hai?'"
+    )
+
+    user_prompt = f"""
+User Name: {username}
+Query: {query}
+
+Live Products:
+{evidence_text}
+
+Recent Searches:
+{recent}
+"""
+
+    try:
+        ai = _client().chat.completions.create(
+            model=OPENAI_MODEL,
+            temperature=0.3,
+            max_tokens=350,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            stream=stream,
+        )
+        if stream:
+            return "".join(chunk.choices[0].delta.content or "" for chunk in ai if chunk.choices)
+        return ai.choices[0].message.content
+
+    except Exception as e:
+        return f"⚠️ AI Error: {e}"
@@ -0,0 +1,354 @@
+# loadtest.py
+# ---------------------------------------------
+# 🚦 END-TO-END LOAD TEST (TRAFFIC REPLAY)
+# Features:
+# - Replays a recorded query log (JSONL: {"query": ..., "user": ...})
+# - Paths:
+#     local  -> chatbot_logic on the CSV catalog
+#     live   -> serpapi_shopping + openai_reply (original live path)
+#     hybrid -> HybridSearch + ReplyRouter (current live app path)
+# - SerpApi + OpenAI replaced by local stubs (loadtest_stubs.py) with
+#   configurable latency, error rate and streaming
+# - Open loop (--rate req/s, Poisson arrivals) or closed loop (--rate 0),
+#   capped at --concurrency requests in flight
+# - Warm-up requests (not measured) before each mode, so client setup
+#   doesn't land in p99
+# - OpenAI client without retries by default (--openai-retries), so every
+#   injected error is counted instead of showing up as latency
+# - Reports throughput, p50 / p99 end-to-end latency, per-stage
+#   breakdown, errors, and the diff against a saved baseline
+#   (relative limit for throughput / latency, absolute for the error rate)
+#
+# Usage: python loadtest.py --mode all --concurrency 8 --rate 20 --requests 200
+#        python loadtest.py --save-baseline loadtest_baseline.json
+#        python loadtest.py --baseline loadtest_baseline.json --max-regression 0.2
+# ---------------------------------------------
+
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import argparse
+import functools
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from loadtest_stubs import StubConfig, SerpApiStub, ChatCompletionsStub, start_stub
+
+MODES = ["local", "live", "hybrid"]
+DEFAULT_LOG = "query_log.jsonl"
+AI_ERROR_PREFIX = "⚠️ AI Error"
+
+
+# ---------- QUERY LOG ----------
+
+def load_query_log(path):
+    """[(query, user)] from JSONL ({"query"/"msg"/"q", "user"}) or plain text lines."""
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                query = rec.get("query") or rec.get("msg") or rec.get("q")
+                if query:
+                    entries.append((query, rec.get("user", "loadtest")))
+            else:
+                entries.append((line, "loadtest"))
+    return entries
+
+
+# ---------- REQUEST PATHS ----------
+# Each runner: (query, user) -> (stages {name: ms}, error or None, route or None)
+
+def _timed(stages, name, fn, *args, **kwargs):
+    start = time.perf_counter()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        stages[name] = (time.perf_counter() - start) * 1000
+
+def make_local_runner():
+    from catalog import CatalogStore
+    from chatbot_core import chatbot_logic
+
+    catalog = CatalogStore().current()
+
+    def run(query, user):
+        stages = {}
+        _timed(stages, "chatbot_logic", chatbot_logic, query, [], catalog, user_name=user)
+        return stages, None, None
+    return run
+
+def make_live_runner(stream):
+    from live_search import serpapi_shopping, openai_reply, LiveSearchError
+
+    def run(query, user):
+        stages = {}
+        errors = []
+        try:
+            products = _timed(stages, "serpapi", serpapi_shopping, query, raise_errors=True)
+        except LiveSearchError:
+            products = []
+            errors.append("serpapi_error")
+        # like the app: the reply is generated even without products
+        reply = _timed(stages, "openai", openai_reply, user, query, products, [], stream=stream)
+        if reply.startswith(AI_ERROR_PREFIX):
+            errors.append("openai_error")
+        if not products and not errors:
+            errors.append("serpapi_empty")
+        return stages, "+".join(errors) or None, None
+    return run
+
+def make_hybrid_runner(stream, cache_path):
+    from catalog import CatalogStore
+    from hybrid_search import HybridSearch, LiveCache
+    from reply_router import ReplyRouter
+    from live_search import serpapi_shopping, openai_reply
+
+    search = HybridSearch(CatalogStore(), live_fetch=functools.partial(serpapi_shopping, raise_errors=True),
+                          cache=LiveCache(cache_path))
+    router = ReplyRouter(llm_reply=functools.partial(openai_reply, stream=stream))
+
+    def run(query, user):
+        stages = {}
+        errors = []
+        products, meta = _timed(stages, "search", search.search, query)
+        if meta.get("live_error"):
+            errors.append("serpapi_error")
+        reply, reply_route = _timed(stages, "reply", router.reply, user, query, products, meta, [])
+        route = f"{meta['route']}+{reply_route}"
+        if reply.startswith(AI_ERROR_PREFIX):
+            errors.append("openai_error")
+        return stages, "+".join(errors) or None, route
+    return run
+
+
+# ---------- DRIVER ----------
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+def replay(run, entries, total, concurrency, rate, seed=1):
+    """Fire `total` requests (cycling the log). Returns the mode's report dict."""
+    rng = random.Random(seed)
+    lock = threading.Lock()
+    latencies = []
+    stage_ms = defaultdict(list)
+    errors = Counter()
+    routes = Counter()
+
+    def one(query, user, arrival):
+        started = time.perf_counter()
+        if arrival is None:
+            arrival = started   # closed loop: no arrival schedule, no queueing
+        try:
+            stages, error, route = run(query, user)
+        except Exception as e:
+            stages, error, route = {}, f"exception:{type(e).__name__}", None
+        done = time.perf_counter()
+        with lock:
+            latencies.append((done - arrival) * 1000)
+            if rate > 0:
+                stage_ms["queue"].append((started - arrival) * 1000)
+            for name, ms in stages.items():
+                stage_ms[name].append(ms)
+            if error:
+                errors[error] += 1
+            if route:
+                routes[route] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        next_arrival = start
+        for i in range(total):
+            query, user = entries[i % len(entries)]
+            if rate > 0:
+                # open loop: arrivals don't wait for earlier requests
+                next_arrival += rng.expovariate(rate)
+                wait = next_arrival - time.perf_counter()
+                if wait > 0:
+                    time.sleep(wait)
+                arrival = next_arrival
+            else:
+                arrival = None
+            pool.submit(one, query, user, arrival)
+    wall = time.perf_counter() - start
+
+    return {
+        "requests": total,
+        "errors": dict(errors),
+        "error_rate": round(sum(errors.values()) / total, 4) if total else 0.0,
+        "throughput_rps": round(total / wall, 2) if wall else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(max(latencies, default=0.0), 2),
+        },
+        "stages_ms": {
+            name: {"p50": round(percentile(v, 50), 2), "p99": round(percentile(v, 99), 2)}
+            for name, v in stage_ms.items()
+        },
+        "routes": dict(routes),
+    }
+
+
+# ---------- REPORT ----------
+
+def print_report(mode, rep):
+    lat = rep["latency_ms"]
+    print(f"\n=== {mode} ===")
+    print(f"requests {rep['requests']}  throughput {rep['throughput_rps']} req/s  "
+          f"p50 {lat['p50']:.1f} ms  p99 {lat['p99']:.1f} ms  max {lat['max']:.1f} ms")
+    for name, s in rep["stages_ms"].items():
+        print(f"  {name:<14} p50 {s['p50']:>9.1f} ms   p99 {s['p99']:>9.1f} ms")
+    if rep["errors"]:
+        print("  errors: " + ", ".join(f"{k}={v}" for k, v in rep["errors"].items()))
+    if rep["routes"]:
+        print("  routes: " + ", ".join(f"{k}={v}" for k, v in sorted(rep["routes"].items())))
+    if rep.get("stubs"):
+        print("  stub calls: " + ", ".join(
+            f"{name} {c['requests']} ({c['errors']} failed)" for name, c in rep["stubs"].items()))
+
+def _change(new, old):
+    """Relative change; anything up from 0 counts as infinitely more."""
+    if old:
+        return (new - old) / old
+    return float("inf") if new > old else 0.0
+
+def compare(report, baseline, max_regression, max_error_increase):
+    """
+    Print deltas vs baseline. Returns the regressions: throughput / latency
+    worse by more than max_regression (relative), error rate up by more
+    than max_error_increase (absolute).
+    """
+    regressions = []
+    print(f"\n=== vs baseline (regression limit {max_regression:.0%}, "
+          f"error rate +{max_error_increase * 100:.1f} pts) ===")
+    old_cfg = baseline.get("config", {})
+    ignored = ["mode", "max_regression", "max_error_increase"]
+    differs = [k for k, v in report["config"].items() if k not in ignored and old_cfg.get(k) != v]
+    if differs:
+        print("warning: load settings differ from the baseline run: " + ", ".join(differs))
+    for mode, rep in report["modes"].items():
+        old = baseline.get("modes", {}).get(mode)
+        if not old:
+            print(f"{mode}: not in baseline")
+            continue
+        checks = [
+            ("throughput", rep["throughput_rps"], old["throughput_rps"], -1),
+            ("p50", rep["latency_ms"]["p50"], old["latency_ms"]["p50"], 1),
+            ("p99", rep["latency_ms"]["p99"], old["latency_ms"]["p99"], 1),
+        ]
+        parts = []
+        for name, new, prev, worse_sign in checks:
+            delta = _change(new, prev)
+            parts.append(f"{name} {prev} -> {new} ({delta:+.0%})")
+            if delta * worse_sign > max_regression:
+                regressions.append(f"{mode} {name}")
+        # rates are compared in absolute points: 0 -> 5% is a regression
+        err_delta = rep["error_rate"] - old["error_rate"]
+        parts.append(f"error_rate {old['error_rate']:.2%} -> {rep['error_rate']:.2%} ({err_delta * 100:+.1f} pts)")
+        if err_delta > max_error_increase:
+            regressions.append(f"{mode} error_rate")
+        print(f"{mode}: " + ", ".join(parts))
+    if regressions:
+        print("REGRESSIONS: " + ", ".join(regressions))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a query log against the chatbot request paths.")
+    parser.add_argument("--log", default=DEFAULT_LOG, help="query log (JSONL or one query per line)")
+    parser.add_argument("--mode", choices=MODES + ["all"], default="all")
+    parser.add_argument("--requests", type=int, default=0, help="total requests per mode (default: log length)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=0.0, help="arrivals per second, 0 = closed loop")
+    parser.add_argument("--stream", action="store_true", help="stream chat completions")
+    parser.add_argument("--serp-latency-ms", type=float, default=300)
+    parser.add_argument("--llm-latency-ms", type=float, default=800)
+    parser.add_argument("--jitter", type=float, default=0.3)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--chunk-ms", type=float, default=20, help="delay between streamed chunks")
+    parser.add_argument("--openai-retries", type=int, default=0, help="OpenAI client max_retries (SDK default 2)")
+    parser.add_argument("--warmup", type=int, default=1, help="unmeasured requests per mode before the replay")
+    parser.add_argument("--baseline", help="compare with this saved report")
+    parser.add_argument("--save-baseline", help="write this run's report here")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="allowed relative throughput / latency regression")
+    parser.add_argument("--max-error-increase", type=float, default=0.01,
+                        help="allowed absolute error rate increase (0.01 = 1 point)")
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = parser.parse_args()
+
+    entries = load_query_log(args.log)
+    if not entries:
+        print(f"No queries in {args.log}")
+        return 1
+    total = args.requests or len(entries)
+    modes = MODES if args.mode == "all" else [args.mode]
+
+    # stubs + env before the live modules create their clients
+    serp_cfg = StubConfig(args.serp_latency_ms, args.jitter, args.error_rate)
+    llm_cfg = StubConfig(args.llm_latency_ms, args.jitter, args.error_rate, args.chunk_ms)
+    _, serp_url = start_stub(SerpApiStub, serp_cfg)
+    _, llm_url = start_stub(ChatCompletionsStub, llm_cfg)
+    os.environ["SERPAPI_URL"] = f"{serp_url}/search.json"
+    os.environ["SERPAPI_API_KEY"] = "stub"
+    os.environ["OPENAI_BASE_URL"] = f"{llm_url}/v1"
+    os.environ["OPENAI_API_KEY"] = "stub"
+    os.environ["OPENAI_MAX_RETRIES"] = str(args.openai_retries)
+
+    report = {
+        "config": {k: v for k, v in vars(args).items() if k not in ["baseline", "save_baseline", "json"]},
+        "modes": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in modes:
+            if mode == "local":
+                run = make_local_runner()
+            elif mode == "live":
+                run = make_live_runner(args.stream)
+            else:
+                run = make_hybrid_runner(args.stream, os.path.join(tmp, "live_cache.db"))
+            # client creation, imports, first connections (hybrid: also caches these queries)
+            for query, user in entries[:args.warmup]:
+                run(query, user)
+            before = {"serpapi": serp_cfg.counters(), "openai": llm_cfg.counters()}
+            rep = replay(run, entries, total, args.concurrency, args.rate)
+            after = {"serpapi": serp_cfg.counters(), "openai": llm_cfg.counters()}
+            rep["stubs"] = {name: {k: after[name][k] - before[name][k] for k in after[name]}
+                            for name in after if after[name]["requests"] > before[name]["requests"]}
+            report["modes"][mode] = rep
+            print_report(mode, rep)
+
+    report["stubs"] = {"serpapi": serp_cfg.counters(), "openai": llm_cfg.counters()}
+    print(f"\nstub calls (incl. warm-up): serpapi {report['stubs']['serpapi']}, openai {report['stubs']['openai']}")
+
+    if args.json:
+        print(json.dumps(report, indent=1, ensure_ascii=False))
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1, ensure_ascii=False)
+        print(f"baseline saved to {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.max_regression, args.max_error_increase):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
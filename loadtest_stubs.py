@@ -0,0 +1,175 @@
+# loadtest_stubs.py
+# ---------------------------------------------
+# 🧪 LOCAL STAND-INS FOR SERPAPI + OPENAI (LOAD TESTING ONLY)
+# - SerpApi stub: GET /search.json -> fake "shopping_results"
+# - OpenAI stub: POST /v1/chat/completions -> chat completion JSON,
+#   or SSE chunks when the request has "stream": true
+# - Configurable latency (+ jitter), error rate and stream chunk delay
+#
+# Standalone:  python loadtest_stubs.py --serp-port 8901 --llm-port 8902
+# Then:        SERPAPI_URL=http://127.0.0.1:8901/search.json
+#              OPENAI_BASE_URL=http://127.0.0.1:8902/v1
+# ---------------------------------------------
+
+import json
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class StubConfig:
+    def __init__(self, latency_ms=300, jitter=0.3, error_rate=0.0,
+                 chunk_ms=20, chunks=40):
+        self.latency_ms = latency_ms   # time to response / first token
+        self.jitter = jitter           # ± share of latency_ms
+        self.error_rate = error_rate   # share of requests answered with HTTP 500
+        self.chunk_ms = chunk_ms       # delay between streamed chunks
+        self.chunks = chunks           # streamed chunks per reply
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def delay(self):
+        spread = self.latency_ms * self.jitter
+        time.sleep(max(0.0, random.uniform(self.latency_ms - spread, self.latency_ms + spread)) / 1000)
+
+    def should_fail(self):
+        fail = random.random() < self.error_rate
+        with self._lock:
+            self.requests += 1
+            if fail:
+                self.errors += 1
+        return fail
+
+    def counters(self):
+        with self._lock:
+            return {"requests": self.requests, "errors": self.errors}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    config = None   # set per server class
+
+    def log_message(self, *args):
+        pass   # keep load-test output readable
+
+    def _json(self, code, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class SerpApiStub(_StubHandler):
+    def do_GET(self):
+        params = parse_qs(urlparse(self.path).query)
+        query = params.get("q", [""])[0]
+        num = int(params.get("num", ["8"])[0])
+        self.config.delay()
+        if self.config.should_fail():
+            self._json(500, {"error": "stub: injected failure"})
+            return
+        results = []
+        for i in range(num):
+            price = 999 + (hash((query, i)) % 90_000)
+            results.append({
+                "title": f"{query.title()} – Stub Item {i + 1}",
+                "price": f"₹{price:,}",
+                "source": random.choice(["Amazon.in", "Flipkart", "Croma", "Reliance Digital"]),
+                "link": f"https://example.com/p/{i}",
+                "thumbnail": None,
+                "snippet": "Stub product for load testing",
+                "rating": round(random.uniform(3.5, 5.0), 1),
+            })
+        self._json(200, {"shopping_results": results})
+
+
+class ChatCompletionsStub(_StubHandler):
+    WORDS = ("Bhai ye options dekho, rating achhi hai aur price bhi sahi hai. "
+             "Best 3 upar diye hain aur 2 alternatives bhi. "
+             "Bhai bolo next kya compare karna hai?").split()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            req = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            req = {}
+        model = req.get("model", "stub")
+        self.config.delay()
+        if self.config.should_fail():
+            self._json(500, {"error": {"message": "stub: injected failure", "type": "server_error"}})
+            return
+
+        words = [self.WORDS[i % len(self.WORDS)] for i in range(self.config.chunks)]
+        created = int(time.time())
+        if not req.get("stream"):
+            self._json(200, {
+                "id": "chatcmpl-stub", "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": " ".join(words)}}],
+                "usage": {"prompt_tokens": 200, "completion_tokens": len(words), "total_tokens": 200 + len(words)},
+            })
+            return
+
+        # server-sent events, connection closes at the end (HTTP/1.0)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+
+        def send(delta, finish=None):
+            chunk = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": created,
+                     "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        send({"role": "assistant", "content": ""})
+        for i, w in enumerate(words):
+            if i:
+                time.sleep(self.config.chunk_ms / 1000)
+            send({"content": (" " if i else "") + w})
+        send({}, finish="stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+
+
+def start_stub(handler, config, port=0):
+    """Start a stub server in a daemon thread. Returns (server, base_url)."""
+    cls = type(handler.__name__, (handler,), {"config": config})
+    server = ThreadingHTTPServer(("127.0.0.1", port), cls)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local SerpApi + OpenAI stand-ins.")
+    parser.add_argument("--serp-port", type=int, default=8901)
+    parser.add_argument("--llm-port", type=int, default=8902)
+    parser.add_argument("--serp-latency-ms", type=float, default=300)
+    parser.add_argument("--llm-latency-ms", type=float, default=800)
+    parser.add_argument("--jitter", type=float, default=0.3)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--chunk-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    _, serp_url = start_stub(SerpApiStub, StubConfig(args.serp_latency_ms, args.jitter, args.error_rate),
+                             args.serp_port)
+    _, llm_url = start_stub(ChatCompletionsStub,
+                            StubConfig(args.llm_latency_ms, args.jitter, args.error_rate, args.chunk_ms),
+                            args.llm_port)
+    print(f"SERPAPI_URL={serp_url}/search.json")
+    print(f"OPENAI_BASE_URL={llm_url}/v1")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+# profiler.py
+# ---------------------------------------------
+# ⏱ ON-DEMAND PROFILER FOR SLOW REQUESTS
+# Features:
+# - Opt-in: CHATBOT_PROFILE=1 env var or admin toggle in the UI
+# - cProfile + stack sampler around a single request
+# - Only requests slower than CHATBOT_PROFILE_SLOW_MS are kept
+# - Writes .prof (pstats / snakeviz) + .collapsed (flamegraph.pl / speedscope)
+# - Rotating local folder (keeps last CHATBOT_PROFILE_KEEP profiles)
+# - Viewer: `python profiler.py` -> slowest queries + hottest functions
+# ---------------------------------------------
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import pstats
+import cProfile
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+# ---------- CONFIG ----------
+PROFILE_ENABLED = os.getenv("CHATBOT_PROFILE", "").lower() in ["1", "true", "yes", "on"]
+SLOW_MS = float(os.getenv("CHATBOT_PROFILE_SLOW_MS", "1000"))
+SAMPLE_RATE = float(os.getenv("CHATBOT_PROFILE_SAMPLE", "1.0"))   # fraction of requests profiled
+PROFILE_DIR = os.getenv("CHATBOT_PROFILE_DIR", "profiles")
+MAX_PROFILES = int(os.getenv("CHATBOT_PROFILE_KEEP", "50"))
+SAMPLE_INTERVAL = 0.005   # seconds between stack samples
+HOT_FUNCS = 8             # hottest functions stored with each profile
+
+_runtime_enabled = None           # admin toggle, overrides env when set
+_profile_lock = threading.Lock()  # cProfile can't run twice at the same time
+
+
+# ---------- TOGGLE ----------
+
+def is_enabled():
+    if _runtime_enabled is not None:
+        return _runtime_enabled
+    return PROFILE_ENABLED
+
+def set_enabled(flag):
+    """Admin toggle. Applies to the whole process (all sessions)."""
+    global _runtime_enabled
+    _runtime_enabled = bool(flag)
+
+
+# ---------- STACK SAMPLER ----------
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+class _StackSampler(threading.Thread):
+    """Samples the stack of one thread -> collapsed stack counts."""
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            parts = []
+            while frame is not None:
+                parts.append(_frame_label(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(parts))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+# ---------- WRITING PROFILES ----------
+
+def _slug(text, limit=40):
+    s = re.sub(r"[^a-z0-9]+", "-", (text or "").lower()).strip("-")
+    return s[:limit] or "empty"
+
+def _hot_functions(stats, limit=HOT_FUNCS):
+    rows = []
+    for (filename, line, func), (cc, nc, tt, ct, callers) in stats.stats.items():
+        rows.append({
+            "func": f"{os.path.basename(filename)}:{line}({func})",
+            "tottime_ms": round(tt * 1000, 2),
+            "cumtime_ms": round(ct * 1000, 2),
+            "calls": nc,
+        })
+    rows.sort(key=lambda r: r["tottime_ms"], reverse=True)
+    return rows[:limit]
+
+def _rotate(folder, keep=MAX_PROFILES):
+    metas = sorted(f for f in os.listdir(folder) if f.endswith(".json"))
+    for old in metas[:max(0, len(metas) - keep)]:
+        base = old[:-len(".json")]
+        for ext in [".json", ".prof", ".collapsed"]:
+            try:
+                os.remove(os.path.join(folder, base + ext))
+            except OSError:
+                pass
+
+def _save_profile(label, query, elapsed_ms, prof, stacks):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base = f"{time.strftime('%Y%m%d-%H%M%S')}-{int(time.time() * 1000) % 1000:03d}_{label}_{_slug(query)}"
+    path = os.path.join(PROFILE_DIR, base)
+
+    prof.dump_stats(path + ".prof")
+    with open(path + ".collapsed", "w", encoding="utf-8") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+
+    meta = {
+        "label": label,
+        "query": query,
+        "elapsed_ms": round(elapsed_ms, 2),
+        "timestamp": time.time(),
+        "prof": base + ".prof",
+        "collapsed": base + ".collapsed",
+        "hot": _hot_functions(pstats.Stats(prof)),
+    }
+    with open(path + ".json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+
+    _rotate(PROFILE_DIR)
+
+
+# ---------- PROFILING HOOK ----------
+
+@contextmanager
+def profile_request(label, query):
+    """
+    Wrap one request:
+        with profile_request("chatbot_logic", msg):
+            ...
+    Does nothing unless profiling is enabled. Profile files are written
+    only when the request took longer than SLOW_MS.
+    """
+    if not is_enabled() or random.random() >= SAMPLE_RATE:
+        yield
+        return
+    # one profiled request at a time, others just run normally
+    if not _profile_lock.acquire(blocking=False):
+        yield
+        return
+
+    try:
+        sampler = _StackSampler(threading.get_ident())
+        prof = cProfile.Profile()
+        sampler.start()
+        start = time.perf_counter()
+        prof.enable()
+        try:
+            yield
+        finally:
+            prof.disable()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            sampler.stop()
+            if elapsed_ms >= SLOW_MS:
+                try:
+                    _save_profile(label, query, elapsed_ms, prof, sampler.stacks)
+                except OSError:
+                    pass   # profiling must never break the request
+    finally:
+        _profile_lock.release()
+
+
+# ---------- VIEWER ----------
+
+def list_slow_profiles(limit=10, folder=None):
+    """Slowest saved requests (newest profiles inside the rotation window)."""
+    folder = folder or PROFILE_DIR
+    if not os.path.isdir(folder):
+        return []
+    entries = []
+    for f in os.listdir(folder):
+        if not f.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(folder, f), encoding="utf-8") as fh:
+                entries.append(json.load(fh))
+        except (OSError, ValueError):
+            continue
+    entries.sort(key=lambda e: e["elapsed_ms"], reverse=True)
+    return entries[:limit]
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="List slowest profiled chatbot requests.")
+    parser.add_argument("--dir", default=PROFILE_DIR)
+    parser.add_argument("-n", "--limit", type=int, default=10)
+    parser.add_argument("-f", "--funcs", type=int, default=5, help="hot functions per query")
+    args = parser.parse_args()
+
+    entries = list_slow_profiles(args.limit, args.dir)
+    if not entries:
+        print(f"No profiles in '{args.dir}'. Run the app with CHATBOT_PROFILE=1.")
+        return
+
+    for e in entries:
+        when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(e["timestamp"]))
+        print(f"{e['elapsed_ms']:>9.1f} ms  [{e['label']}]  {e['query']!r}  ({when})")
+        for h in e["hot"][:args.funcs]:
+            print(f"{'':13}{h['tottime_ms']:>8.1f} ms self  {h['cumtime_ms']:>8.1f} ms cum  {h['func']}")
+        print(f"{'':13}-> {os.path.join(args.dir, e['prof'])}, {e['collapsed']}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
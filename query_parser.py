@@ -0,0 +1,252 @@
+# query_parser.py
+# ---------------------------------------------
+# 🔎 QUERY PARSING HELPERS
+# Shared by ProductChatbot.py and ProductChatbot_openai.py
+# - Brand + category detection (keyword lists)
+# - Price constraints: "under 20k", "between 10000 and 20000",
+#   "above 50000", "around 30000", "1.5 lakh", "10k-20k", "₹999"
+#   + the Hinglish budget text used in replies (price_text)
+# - Model numbers in a query ("iphone 16", "galaxy s99") for result checks
+# ---------------------------------------------
+
+import re
+from collections import namedtuple
+
+# ---------- BRAND / CATEGORY ----------
+BRANDS = [
+    "samsung","iphone","apple","xiaomi","redmi","realme","oneplus",
+    "vivo","oppo","iqoo","tecno","moto","nokia",
+    "hp","dell","asus","lenovo","acer","msi","microsoft","infinix",
+    "nike","adidas","levis","zara","puma","h&m","woodland","us polo",
+    "biba","ray-ban","wildcraft","jockey","casio","titan","fossil",
+    "ikea","godrej","nilkamal",
+    "prestige","milton","cello","bajaj","whirlpool","havells","philips",
+    "kent","faber","kutchina",
+    "tata","aashirvaad","amul","colgate","nivea","lakme","dove","maggi",
+    "surf","clinic","parachute"
+]
+
+CATEGORY_CANONICAL = {
+    "smartphone": "Smartphone",
+    "laptop": "Laptop",
+    "television": "Television",
+    "fashion": "Fashion",
+    "furniture": "Furniture",
+    "kitchen": "Kitchen",
+    "home appliance": "Home Appliance",
+    "grocery": "Grocery",
+    "beauty": "Beauty",
+}
+
+CATEGORY_SYNONYMS = {
+    "smartphone": ["phone","mobile","smartphone"],
+    "laptop": ["laptop","notebook"],
+    "television": ["tv","television","smart tv"],
+    "fashion": ["clothes","cloths","dress","shirt","tshirt","t-shirt","jeans",
+                "hoodie","jacket","coat","kurti","kurta","shoes","sneaker",
+                "fashion","wear","top"],
+    "furniture": ["furniture","sofa","bed","almirah","wardrobe","chair",
+                  "table","bookshelf","mattress"],
+    "kitchen": ["kitchen","cooker","pressure cooker","stove","gas stove",
+                "pan","fry pan","bottle","utensil"],
+    "home appliance": ["appliance","fridge","refrigerator","washing machine",
+                       "fan","bulb","chimney","heater","cooler","air cooler",
+                       "purifier"],
+    "grocery": ["grocery","atta","tea","noodles","maggi","detergent","butter","rice"],
+    "beauty": ["beauty","cream","lotion","shampoo","kajal","serum","perfume",
+               "lipstick","oil","cosmetic"],
+}
+
+
+def detect_brand(msg: str):
+    for b in BRANDS:
+        if b in msg:
+            return b
+    return None
+
+def detect_category(msg: str):
+    for logical_cat, words in CATEGORY_SYNONYMS.items():
+        for w in words:
+            if w in msg:
+                return CATEGORY_CANONICAL[logical_cat]
+    for logical_cat, canonical in CATEGORY_CANONICAL.items():
+        if logical_cat in msg:
+            return canonical
+    return None
+
+
+# ---------- PRICE ----------
+
+# low / high are inclusive, None = open end
+PriceRange = namedtuple("PriceRange", ["low", "high", "kind"])   # kind: max / min / between / around
+
+AROUND_TOLERANCE = 0.10   # "around 30000" -> ±10% unless the query says otherwise
+
+_MULTIPLIERS = {
+    "k": 1_000, "thousand": 1_000,
+    "lakh": 100_000, "lakhs": 100_000, "lac": 100_000, "lacs": 100_000,
+}
+
+_CURRENCY = r"(₹|\brs\b\.?|\binr\b)?\s*"
+# groups: currency, number, suffix, trailing currency
+_AMOUNT = (_CURRENCY + r"(\d[\d,]*(?:\.\d+)?)\s*(k|thousand|lakhs?|lacs?)?\b"
+           r"(\s*(?:rs\b\.?|rupees|inr\b|/-))?")
+# "above 4 star", "over 2 years warranty", "under 6 inch" -> not a price
+_UNIT = re.compile(
+    r"\s*(?:(?:stars?|years?|yrs?|months?|days?|hours?|hrs?|gb|tb|mb|mp|mah|inch(?:es)?|"
+    r"cm|mm|kg|g|ltrs?|litres?|liters?|ml|w|watts?|hz)\b|%|\")"
+)
+MIN_BARE_PRICE = 100   # a bare number below this (no ₹ / k / lakh) isn't read as a price
+
+def _keywords(words, symbols=""):
+    alts = r"\b(?:" + "|".join(words) + r")"
+    if symbols:
+        alts += r"|[" + symbols + r"]=?"
+    return r"(?:" + alts + r")\s*"
+
+_BETWEEN = re.compile(
+    r"(\b(?:between|from|range)\s*)?" + _AMOUNT + r"\s*(?:-|–|\bto\b|\band\b)\s*" + _AMOUNT
+)
+_AROUND = re.compile(
+    _keywords(["around", "about", "approx", "approximately", "near", "nearly", "roughly"], "~")
+    + _AMOUNT + r"(?:\s*(?:±|\+-|\+/-)\s*(\d+(?:\.\d+)?)\s*%)?"
+)
+_MIN = re.compile(
+    _keywords(["above", "over", "more than", "greater than", "at least", "atleast",
+               "minimum", "min", "starting from", "starting at", "starting"], ">")
+    + _AMOUNT
+)
+_MAX = re.compile(
+    _keywords(["under", "below", "less than", "less", "within", "upto", "up to",
+               "maximum", "max", "budget of", "budget is", "budget"], "<")
+    + _AMOUNT
+)
+_CURRENCY_ONLY = re.compile(
+    r"(?:₹|\brs\b\.?|\binr\b)\s*(\d[\d,]*(?:\.\d+)?)\s*(k|thousand|lakhs?|lacs?)?\b"
+    r"|(\d[\d,]*(?:\.\d+)?)\s*(k|thousand|lakhs?|lacs?)?\s*(?:rs\b\.?|rupees|inr\b|/-)"
+    # "1.5 lakh" without currency, but not "4k tv"
+    r"|(\d[\d,]*(?:\.\d+)?)\s*(thousand|lakhs?|lacs?)\b"
+)
+
+
+def parse_amount(number: str, suffix=None):
+    """'20' + 'k' -> 20000, '1.5' + 'lakh' -> 150000, '25,999' -> 25999"""
+    value = float(number.replace(",", ""))
+    if suffix:
+        value *= _MULTIPLIERS[suffix.lower()]
+    return int(round(value))
+
+def _price_like(m, value, currency, suffix, tail):
+    """False for "rating above 4" / "over 2 years warranty": small bare numbers and numbers with a unit."""
+    if _UNIT.match(m.string, m.end()):
+        return False
+    return bool(currency or suffix or tail) or value >= MIN_BARE_PRICE
+
+def _between(m):
+    kw, cur_a, num_a, suf_a, tail_a, cur_b, num_b, suf_b, tail_b = m.groups()[:9]
+    # "10-20k" -> both in thousands, "5000 to 20k" -> only the second
+    if not suf_a and suf_b and float(num_a.replace(",", "")) < float(num_b.replace(",", "")):
+        suf_a = suf_b
+    a = parse_amount(num_a, suf_a)
+    b = parse_amount(num_b, suf_b)
+    # plain "12 - 13" is more likely a model number than a price
+    if not (kw or cur_a or cur_b or suf_a or suf_b or tail_a or tail_b) and min(a, b) < MIN_BARE_PRICE:
+        return None
+    if _UNIT.match(m.string, m.end()):   # "between 4 and 5 stars"
+        return None
+    return PriceRange(min(a, b), max(a, b), "between")
+
+def price_text(pr):
+    """PriceRange -> short Hinglish budget text."""
+    if pr.kind == "around":
+        return f"budget **₹{pr.low}–₹{pr.high} ke aas-paas**"
+    if pr.low is not None and pr.high is not None:
+        return f"budget **₹{pr.low} se ₹{pr.high} tak**"
+    if pr.low is not None:
+        return f"budget **₹{pr.low} se upar**"
+    return f"budget **₹{pr.high} tak**"
+
+def _bound(pattern, msg):
+    """First "under X" / "above X" amount that reads as a price -> (value, span), or (None, None)."""
+    for m in pattern.finditer(msg):
+        value = parse_amount(m.group(2), m.group(3))
+        if _price_like(m, value, m.group(1), m.group(3), m.group(4)):
+            return value, m.span()
+    return None, None
+
+def _parse_price(msg):
+    """(PriceRange or None, spans of the price text) for a lowercased message."""
+    for m in _BETWEEN.finditer(msg):
+        pr = _between(m)
+        if pr:
+            return pr, [m.span()]
+
+    for m in _AROUND.finditer(msg):
+        center = parse_amount(m.group(2), m.group(3))
+        if not _price_like(m, center, m.group(1), m.group(3), m.group(4)):
+            continue
+        tol = float(m.group(5)) / 100 if m.group(5) else AROUND_TOLERANCE
+        return PriceRange(int(center * (1 - tol)), int(center * (1 + tol)), "around"), [m.span()]
+
+    low, low_span = _bound(_MIN, msg)
+    high, high_span = _bound(_MAX, msg)
+    if low is not None and high is not None:
+        return PriceRange(min(low, high), max(low, high), "between"), [low_span, high_span]
+    if low is not None:
+        return PriceRange(low, None, "min"), [low_span]
+    if high is not None:
+        return PriceRange(None, high, "max"), [high_span]
+
+    # bare "₹999" / "999 rs" / "1.5 lakh" -> budget
+    m = _CURRENCY_ONLY.search(msg)
+    if m:
+        g = m.groups()
+        number, suffix = next((g[i], g[i + 1]) for i in (0, 2, 4) if g[i])
+        return PriceRange(None, parse_amount(number, suffix), "max"), [m.span()]
+    return None, []
+
+def detect_price_range(msg: str):
+    """
+    Parse a price constraint from a message.
+    Returns PriceRange(low, high, kind) or None.
+    Only numbers next to a price word / currency count, so
+    "iphone 15 under 80000" gives (None, 80000) and not 15.
+    """
+    return _parse_price(msg.lower())[0]
+
+def split_price(msg: str):
+    """
+    (PriceRange or None, lowercased message without the price text)
+    "iphone 16 under 90000" -> (PriceRange(None, 90000, "max"), "iphone 16  ")
+    """
+    msg = msg.lower()
+    pr, spans = _parse_price(msg)
+    for start, end in sorted(spans, reverse=True):
+        msg = msg[:start] + " " + msg[end:]
+    return pr, msg
+
+
+# ---------- MODEL NUMBERS ----------
+
+WORD_PATTERN = re.compile(r"[a-z0-9](?:[a-z0-9&'-]|\.(?=\d))*")   # "4.5" is one word
+_RATING_BEFORE = re.compile(r"\b(?:rating|rated)\s+(?:[a-z]+\s+)?$")
+
+def model_tokens(msg: str):
+    """
+    Words with a digit outside the price text – "16" in "iphone 16 under
+    90000", "s99" in "samsung galaxy s99". They name one model, so a result
+    without them is a different product. "4 star" / "rating above 4" / "8gb"
+    style numbers are specs, not models.
+    """
+    rest = split_price(msg)[1]
+    tokens = []
+    for m in WORD_PATTERN.finditer(rest):
+        word = m.group()
+        if not any(c.isdigit() for c in word) or _UNIT.match(rest, m.end()):
+            continue
+        if _RATING_BEFORE.search(rest, 0, m.start()):
+            continue
+        if re.fullmatch(r"\d+(?:gb|tb|mb|mp|mah|hz|w)", word):
+            continue
+        tokens.append(word)
+    return tokens
@@ -0,0 +1,179 @@
+# reply_router.py
+# ---------------------------------------------
+# ⚡ REPLY ROUTER – TEMPLATE FAST-PATH vs LLM
+# Features:
+# - Structured, high-confidence queries ("samsung phone under 25000")
+#   get an instant Hinglish template reply from the ranked results
+# - Catalog items arrive filtered + ranked; live (SerpApi / cached) items
+#   don't, so they are filtered by the parsed brand + price range and
+#   ranked before the template shows them
+# - A model number in the query ("iphone 16") must be in the top result,
+#   otherwise the LLM answers (the template would show other models)
+# - No results because the live search failed -> "try again" reply,
+#   not "nothing found"
+# - Open-ended / comparative questions ("iphone vs samsung", "which is
+#   better for gaming?") still go to the LLM
+# - Per-route counts + latency (avg / p50 / p95) for the UI
+# ---------------------------------------------
+
+import re
+import time
+import threading
+from collections import deque
+
+from query_parser import WORD_PATTERN, model_tokens, price_text
+
+TEMPLATE = "template"
+LLM = "llm"
+
+LATENCY_WINDOW = 500   # last N latencies kept per route
+
+# words that mean the user wants reasoning, not a list
+_OPEN_ENDED = re.compile(
+    r"\b(?:vs|versus|compare|comparison|difference|better|worth|which|why|how|should|"
+    r"or|review|reviews|pros|cons|explain|kya\s+lu|konsa|kaunsa)\b|\?"
+)
+
+
+class ReplyRouter:
+    """
+        router = ReplyRouter(llm_reply=openai_reply)
+        text, route = router.reply(username, query, results, search_meta, history)
+    `search_meta` is the meta dict from HybridSearch.search().
+    """
+
+    def __init__(self, llm_reply):
+        self.llm_reply = llm_reply
+        self._lock = threading.Lock()
+        self._counts = {TEMPLATE: 0, LLM: 0}
+        self._latencies = {TEMPLATE: deque(maxlen=LATENCY_WINDOW), LLM: deque(maxlen=LATENCY_WINDOW)}
+
+    # ----- routing -----
+
+    def classify(self, query, results, meta):
+        """(route, reason). `results` as returned by checked_results()."""
+        if _OPEN_ENDED.search(query.lower()):
+            return LLM, "open-ended / comparative question"
+        signals = sum(1 for k in ["brand", "category", "price_range"] if meta.get(k))
+        understood = meta.get("understood", 0)
+        if not results:
+            # nothing to talk about – an LLM can't invent products either
+            if meta.get("live_error"):
+                return TEMPLATE, "live search failed"
+            return (TEMPLATE, "no results") if signals else (LLM, "nothing parsed, no results")
+        missing = set(model_tokens(query)) - set(WORD_PATTERN.findall(results[0]["title"].lower()))
+        if missing:
+            return LLM, f"model {', '.join(sorted(missing))} not in the top result"
+        if signals >= 2 and understood >= 0.75:
+            return TEMPLATE, f"{signals} filters parsed, {len(results)} results"
+        if signals >= 1 and understood >= 1.0 and len(results) >= 3:
+            return TEMPLATE, f"fully parsed, {len(results)} results"
+        return LLM, "low confidence"
+
+    def reply(self, username, query, results, meta, history):
+        start = time.perf_counter()
+        checked = checked_results(results, meta)
+        route, _ = self.classify(query, checked, meta)
+        if route == TEMPLATE:
+            text = template_reply(username, checked, meta)
+        else:
+            text = self.llm_reply(username, query, results, history)
+        self._record(route, (time.perf_counter() - start) * 1000)
+        return text, route
+
+    # ----- stats -----
+
+    def _record(self, route, ms):
+        with self._lock:
+            self._counts[route] += 1
+            self._latencies[route].append(ms)
+
+    def stats(self):
+        """route -> {count, avg_ms, p50_ms, p95_ms} (latency over the last LATENCY_WINDOW)."""
+        out = {}
+        with self._lock:
+            for route, count in self._counts.items():
+                lat = sorted(self._latencies[route])
+                if lat:
+                    out[route] = {
+                        "count": count,
+                        "avg_ms": sum(lat) / len(lat),
+                        "p50_ms": lat[len(lat) // 2],
+                        "p95_ms": lat[min(len(lat) - 1, int(len(lat) * 0.95))],
+                    }
+                else:
+                    out[route] = {"count": 0, "avg_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0}
+        return out
+
+
+# ---------- TEMPLATES ----------
+
+def _in_range(price, pr):
+    return bool(price) and (pr.low is None or price >= pr.low) and (pr.high is None or price <= pr.high)
+
+def checked_results(results, meta):
+    """
+    Results the template may present as matches: catalog items as they are
+    (Catalog.filter already applied the filters and ranking), then live /
+    cached items with the parsed brand in the title and inside the parsed
+    price range, best rated + cheapest first.
+    """
+    catalog = [r for r in results if r.get("origin") == "catalog"]
+    live = [r for r in results if r.get("origin") != "catalog"]
+    brand = meta.get("brand")
+    if brand:
+        live = [r for r in live if brand.lower() in (r.get("title") or "").lower()]
+    pr = meta.get("price_range")
+    if pr is not None:
+        live = [r for r in live if _in_range(r.get("price"), pr)]
+    live.sort(key=lambda r: (-(r.get("rating") or 0), r.get("price") or float("inf")))
+    return catalog + live
+
+def _criteria(meta):
+    parts = []
+    if meta.get("brand"):
+        parts.append(f"brand **{meta['brand'].title()}**")
+    if meta.get("category"):
+        parts.append(f"category **{meta['category']}**")
+    if meta.get("price_range") is not None:
+        parts.append(price_text(meta["price_range"]))
+    return ", ".join(parts) if parts else "aapke search"
+
+def _line(i, p):
+    rating = f", ⭐ {p['rating']}" if p.get("rating") else ""
+    return f"{i}. **{p['title']}** – ₹{p['price']:,}{rating} ({p['source']})"
+
+def template_reply(username, results, meta):
+    """Hinglish reply in the same shape the LLM prompt asks for: best 3 + 2 alternatives."""
+    name = f"{username} bhai" if username else "bhai"
+    criteria = _criteria(meta)
+    if not results and meta.get("live_error"):
+        # SerpApi failed: "nothing found" would be wrong, ask to retry
+        return (
+            f"😓 {name}, abhi live search nahi chal paaya, isliye {criteria} ke products check nahi ho sake.\n\n"
+            "Thodi der baad dobara try karo.\n\n"
+            "Bhai bolo next kya compare karna hai?"
+        )
+    if not results:
+        return (
+            f"😅 {name}, {criteria} ke hisaab se abhi koi product nahi mila.\n\n"
+            "Budget thoda badha ke ya brand hata ke try karo.\n\n"
+            "Bhai bolo next kya compare karna hai?"
+        )
+
+    best = results[:3]
+    alternatives = results[3:5]
+    lines = [f"✅ {name}, {criteria} ke hisaab se ye best options hain:", ""]
+    lines += [_line(i + 1, p) for i, p in enumerate(best)]
+    if alternatives:
+        lines += ["", "🔁 Alternatives:"]
+        lines += [_line(i + 1, p) for i, p in enumerate(alternatives)]
+    top = best[0]
+    why = "price aapke range me fit hai" if meta.get("price_range") else "rating aur price dono strong hai"
+    lines += [
+        "",
+        f"Mera pick: **{top['title']}** – list me sabse upar hai aur {why}. 🔥",
+        "",
+        "Bhai bolo next kya compare karna hai?",
+    ]
+    return "\n".join(lines)
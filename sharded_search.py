@@ -0,0 +1,249 @@
+# sharded_search.py
+# ---------------------------------------------
+# 🧩 SHARDED CATALOG SEARCH (MULTI-PROCESS)
+# Features:
+# - Catalog frame split into N shards (hash of product_id or by category)
+# - One worker process per shard, each holding a Catalog of its own rows
+# - filter / find_similar run on all shards in parallel, every worker
+#   returns its local top-k, the coordinator merges them
+# - Same ranking as the single-process Catalog path: rating desc,
+#   price asc, then original catalog order
+# - Catalog reloads are forwarded as change batches: each worker applies
+#   only its own upserts / deletes (Catalog.apply), no respawn
+# Enable in the app with CATALOG_SHARDS=<n> (0 = single process)
+# ---------------------------------------------
+
+import os
+import zlib
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from catalog import POS_COL, RANK_ASC, RANK_COLS, Catalog
+
+SHARDS = int(os.getenv("CATALOG_SHARDS", "0"))
+SHARD_BY = os.getenv("CATALOG_SHARD_BY", "hash")   # "hash" or "category"
+TOP_K = int(os.getenv("CATALOG_SHARD_TOP_K", "50"))  # rows each shard sends back
+
+
+# ---------- WORKER SIDE ----------
+
+_shard = None   # Catalog of this worker's rows
+
+def _init_worker(shard_df):
+    global _shard
+    _shard = Catalog.from_frame(shard_df)
+
+def _worker_ready():
+    return len(_shard.df)
+
+def _worker_apply(upserts, deletes):
+    global _shard
+    _shard = _shard.apply(upserts, deletes)
+    return len(_shard.df)
+
+def _top(frame, k):
+    return frame if k is None else frame.head(k)
+
+# Catalog rankings end with the catalog position (POS_COL), so a shard's
+# top-k is already in global order – also for products moved in later
+
+def _worker_filter(brand, category, price_min, price_max, k):
+    return _top(_shard.filter(brand=brand, category=category, price_min=price_min, price_max=price_max), k)
+
+def _worker_first_match(query):
+    cand = _shard.name_matches(query)
+    if cand.empty:
+        return None
+    # lowest catalog position, not frame order: a product that moved here
+    # from another shard sits at the end of this shard's frame
+    return cand.loc[cand[POS_COL].idxmin()]
+
+def _worker_similar(base, k):
+    return _top(_shard.similar_to(base), k)
+
+
+# ---------- PARTITIONING ----------
+
+def shard_of(product_id, n):
+    # crc32 instead of hash(): stable across processes and restarts
+    return zlib.crc32(str(product_id).encode("utf-8")) % n
+
+def partition(df, n, by="hash"):
+    """Split a catalog frame into n shards, keeping catalog order (POS_COL) inside each."""
+    if by == "category":
+        # biggest categories first, each to the currently smallest shard
+        sizes = df["cat_lower"].value_counts()
+        load = [0] * n
+        owner = {}
+        for cat, size in sizes.items():
+            i = load.index(min(load))
+            owner[cat] = i
+            load[i] += size
+        keys = df["cat_lower"].map(owner)
+    else:
+        keys = pd.Series([shard_of(pid, n) for pid in df["product_id"]], index=df.index)
+    return [df[(keys == i).values] for i in range(n)], (owner if by == "category" else None)
+
+
+# ---------- COORDINATOR ----------
+
+def merge_top(frames, k=None):
+    """Merge per-shard rankings into the global ranking."""
+    frames = [f for f in frames if f is not None and not f.empty]
+    if not frames:
+        return None
+    merged = pd.concat(frames).sort_values(RANK_COLS, ascending=RANK_ASC, kind="mergesort")
+    return _top(merged, k)
+
+class ShardedCatalog:
+    """
+    Catalog search spread over worker processes.
+        sc = ShardedCatalog(catalog.df, n_shards=4)
+        sc.filter(brand="samsung", k=10)
+        sc.find_similar("iphone 15")
+        sc.apply(upserts, deletes, version)   # one Catalog.changelog batch
+        sc.close()
+    """
+
+    def __init__(self, df, n_shards=None, by=SHARD_BY, version=None):
+        self.n_shards = n_shards or os.cpu_count() or 1
+        self.by = by
+        self.version = version
+        self._empty = df.iloc[0:0]
+        shards, self._cat_owner = partition(df, self.n_shards, by)
+        self._sizes = [len(shard) for shard in shards]
+        self._submit_lock = threading.Lock()
+        # spawn: workers must not inherit Streamlit's threads / sockets
+        ctx = multiprocessing.get_context("spawn")
+        self._workers = [
+            ProcessPoolExecutor(max_workers=1, mp_context=ctx,
+                                initializer=_init_worker, initargs=(shard,))
+            for shard in shards
+        ]
+        # start all workers now instead of on the first query
+        self._map(self._workers, _worker_ready)
+
+    def _targets(self, category=None):
+        # category sharding: a category lives on exactly one shard
+        if category and self._cat_owner is not None:
+            owner = self._cat_owner.get(category.lower())
+            return [] if owner is None else [self._workers[owner]]
+        return self._workers
+
+    def _map(self, workers, fn, *args):
+        # submitted together, so an update can't land between two shards
+        with self._submit_lock:
+            futures = [w.submit(fn, *args) for w in workers]
+        return [f.result() for f in futures]
+
+    def _owner(self, row):
+        if self._cat_owner is None:
+            return shard_of(row["product_id"], self.n_shards)
+        cat = row["category"].lower()
+        if cat not in self._cat_owner:
+            self._cat_owner[cat] = self._sizes.index(min(self._sizes))   # new category
+        return self._cat_owner[cat]
+
+    def apply(self, upserts, deletes, version=None):
+        """
+        Forward one change batch – full product rows (with their catalog
+        position) + deleted ids, as in Catalog.changelog – to the shards
+        owning those products.
+        """
+        n = self.n_shards
+        shard_upserts = [[] for _ in range(n)]
+        shard_deletes = [[] for _ in range(n)]
+        for pid in deletes:
+            if self._cat_owner is None:
+                shard_deletes[shard_of(pid, n)].append(pid)
+            else:
+                for i in range(n):   # unknown ids are ignored by a shard
+                    shard_deletes[i].append(pid)
+        for row in upserts:
+            owner = self._owner(row)
+            shard_upserts[owner].append(row)
+            if self._cat_owner is not None:
+                # the category may have changed -> drop it from its old shard
+                for i in range(n):
+                    if i != owner:
+                        shard_deletes[i].append(row["product_id"])
+
+        with self._submit_lock:
+            futures = {i: w.submit(_worker_apply, shard_upserts[i], shard_deletes[i])
+                       for i, w in enumerate(self._workers)
+                       if shard_upserts[i] or shard_deletes[i]}
+        for i, f in futures.items():
+            self._sizes[i] = f.result()
+        self.version = version
+
+    def filter(self, brand=None, category=None, price_min=None, price_max=None, k=None):
+        parts = self._map(self._targets(category), _worker_filter, brand, category, price_min, price_max, k)
+        merged = merge_top(parts, k)
+        return self._empty if merged is None else merged
+
+    def find_similar(self, product_query, k=None):
+        firsts = [r for r in self._map(self._workers, _worker_first_match, product_query) if r is not None]
+        if not firsts:
+            return None, None
+        base = min(firsts, key=lambda r: r[POS_COL])
+        parts = self._map(self._targets(base["category"]), _worker_similar, base, k)
+        merged = merge_top(parts, k)
+        return base, (self._empty if merged is None else merged)
+
+    def close(self):
+        for w in self._workers:
+            w.shutdown(wait=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ShardManager:
+    """
+    Keeps the ShardedCatalog in step with the catalog. New versions are
+    forwarded from catalog.changelog to the running workers; only a gap in
+    the log (or a failed update) rebuilds the shards, and then the previous
+    ShardedCatalog is kept for one more generation so in-flight queries can
+    finish. A query on an older snapshot is served by the newer shards.
+    """
+
+    def __init__(self, n_shards=SHARDS, by=SHARD_BY):
+        self.n_shards = n_shards
+        self.by = by
+        self._current = None
+        self._previous = None
+        self._lock = threading.Lock()
+
+    def _forward(self, sharded, catalog):
+        """Bring `sharded` up to `catalog` through the change log. False if that isn't possible."""
+        pending = [c for c in catalog.changelog if c[0] > sharded.version]
+        if not pending or pending[0][0] != sharded.version + 1 or pending[-1][0] != catalog.version:
+            return False
+        try:
+            for version, upserts, deletes in pending:
+                sharded.apply(upserts, deletes, version)
+        except Exception:
+            return False
+        return True
+
+    def get(self, catalog):
+        cur = self._current
+        if cur is not None and cur.version >= catalog.version:
+            return cur
+        with self._lock:
+            cur = self._current
+            if cur is not None and cur.version >= catalog.version:
+                return cur
+            if cur is not None and self._forward(cur, catalog):
+                return cur
+            fresh = ShardedCatalog(catalog.df, self.n_shards, self.by, version=catalog.version)
+            if self._previous is not None:
+                self._previous.close()
+            self._previous, self._current = cur, fresh
+            return fresh